@@ -10,7 +10,6 @@ from src.http.odds_router import router as odds_router
 from src.http.public_router import router as public_router
 from src.http.public_partner_applications_router import router as public_partner_applications_router
 from src.http.admin_odds_router import router as legacy_admin_odds_router
-from src.http.admin_matchup_router import router as admin_matchup_router
 from src.http.admin_catalog_router import router as admin_catalog_router
 from src.http.product_leagues_router import router as product_leagues_router
 from src.http.product_manual_analysis_router import router as product_manual_analysis_router
@@ -63,7 +62,6 @@ def create_app() -> FastAPI:
     api.include_router(public_router)
     api.include_router(public_partner_applications_router)
     api.include_router(legacy_admin_odds_router)
-    api.include_router(admin_matchup_router)
 
     if settings.app_env in {"dev", "development", "local", "test"}:
         api.include_router(debug_db_router)
@@ -91,19 +89,18 @@ def create_app() -> FastAPI:
     if settings.worldcup_pool_enabled:
         api.include_router(worldcup_pool_router)
 
-    @api.get("/", response_class=HTMLResponse)
-    def index():
-        index_path = BASE_DIR / "index.html"
-        if index_path.exists():
-            return index_path.read_text(encoding="utf-8")
-        return "<h1>prevIA</h1><p>index.html não encontrado.</p>"
-
-    @api.get("/health")
-    def health():
-        if settings.app_env in {"prod", "production"}:
-            return {"ok": True}
-
-        return {
+    # Settings não mudam após o load e o index.html é estático:
+    # ambos são resolvidos uma vez no startup em vez de a cada request.
+    index_path = BASE_DIR / "index.html"
+    if index_path.exists():
+        index_html = index_path.read_text(encoding="utf-8")
+    else:
+        index_html = "<h1>prevIA</h1><p>index.html não encontrado.</p>"
+
+    if settings.app_env in {"prod", "production"}:
+        health_payload = {"ok": True}
+    else:
+        health_payload = {
             "ok": True,
             "db_path": settings.db_path,
             "database_url_set": bool(settings.database_url),
@@ -128,6 +125,14 @@ def create_app() -> FastAPI:
             "ops_trigger_token_set": bool(settings.ops_trigger_token),
         }
 
+    @api.get("/", response_class=HTMLResponse)
+    def index():
+        return HTMLResponse(content=index_html)
+
+    @api.get("/health")
+    def health():
+        return health_payload
+
     return api
 
 
@@ -15,15 +15,22 @@ if str(PROJECT_ROOT) not in sys.path:
 from src.etl.core_etl_pg import run_core_etl  # noqa: E402
 
 
+# Assinatura resolvida uma vez no import (não muda em runtime).
+_RUN_CORE_ETL_PARAMS = inspect.signature(run_core_etl).parameters
+_RUN_CORE_ETL_ACCEPTS_ANY = any(
+    p.kind is inspect.Parameter.VAR_KEYWORD for p in _RUN_CORE_ETL_PARAMS.values()
+)
+_RUN_CORE_ETL_ALLOWED = frozenset(_RUN_CORE_ETL_PARAMS)
+
+
 def _call_run_core_etl_dynamic(**kwargs) -> Any:
     """
     Chama run_core_etl apenas com kwargs que existam na assinatura real.
     Evita quebrar quando o runner não tem certos parâmetros (ex.: seasons).
     """
-    sig = inspect.signature(run_core_etl)
-    allowed = set(sig.parameters.keys())
-    filtered = {k: v for k, v in kwargs.items() if k in allowed}
-    return run_core_etl(**filtered)
+    if _RUN_CORE_ETL_ACCEPTS_ANY:
+        return run_core_etl(**kwargs)
+    return run_core_etl(**{k: v for k, v in kwargs.items() if k in _RUN_CORE_ETL_ALLOWED})
 
 
 def main():
@@ -0,0 +1,14 @@
+BEGIN;
+
+-- high-water mark do ETL RAW -> CORE (run_core_etl(incremental=True)):
+-- último raw.api_responses.id já mapeado por (provider, endpoint, escopo de ligas/seasons)
+CREATE TABLE IF NOT EXISTS core.etl_watermark (
+  provider        TEXT NOT NULL,
+  endpoint        TEXT NOT NULL,
+  scope           TEXT NOT NULL,
+  last_raw_id     BIGINT NOT NULL DEFAULT 0,
+  updated_at_utc  TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (provider, endpoint, scope)
+);
+
+COMMIT;
@@ -0,0 +1,10 @@
+BEGIN;
+
+-- busca de times por tokens (admin_odds_router._find_team_ids_bulk):
+-- lower(name) ILIKE '%token%' usa o GIN trigram em vez de seq scan em core.teams
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_core_teams_lower_name_trgm
+  ON core.teams USING gin (lower(name) gin_trgm_ops);
+
+COMMIT;
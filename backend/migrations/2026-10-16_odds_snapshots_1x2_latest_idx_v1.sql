@@ -0,0 +1,10 @@
+BEGIN;
+
+-- último snapshot 1x2 por evento (admin /queue e /queue/intel: LATERAL ... ORDER BY
+-- captured_at_utc DESC LIMIT 1): seek direto no índice, com as colunas de odds
+-- no INCLUDE para index-only scan.
+CREATE INDEX IF NOT EXISTS ix_odds_snapshots_1x2_event_captured_desc
+  ON odds.odds_snapshots_1x2 (event_id, captured_at_utc DESC)
+  INCLUDE (bookmaker, market, odds_home, odds_draw, odds_away);
+
+COMMIT;
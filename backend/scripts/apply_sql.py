@@ -6,7 +6,7 @@ BACKEND_DIR = Path(__file__).resolve().parents[1]
 if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
-from src.db.pg import pg_conn  # noqa: E402
+from src.db.pg import pg_conn, pg_tx  # noqa: E402
 
 
 def main() -> int:
@@ -21,10 +21,12 @@ def main() -> int:
 
     sql = sql_path.read_text(encoding="utf-8-sig")
 
+    # Arquivo inteiro num único execute (simple query protocol, 1 round-trip) e
+    # numa única transação: não dividir em ";" — várias migrations têm blocos DO $$.
     with pg_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql)
-        conn.commit()
+        with pg_tx(conn):
+            with conn.cursor() as cur:
+                cur.execute(sql)
 
     print(f"OK: applied {sql_path}")
     return 0
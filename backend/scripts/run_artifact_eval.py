@@ -2,36 +2,43 @@ from __future__ import annotations
 
 import argparse
 import json
-import math
+from contextlib import nullcontext
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
-from src.db.pg import pg_conn
+import numpy as np
+import psycopg
+from psycopg.rows import dict_row
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to stdlib json
+    orjson = None
+
+from src.db.pg import pg_conn, pg_tx
 
 
 # -----------------------------
 # Metrics
 # -----------------------------
-def _clip(p: float, eps: float = 1e-15) -> float:
-    return min(1.0 - eps, max(eps, p))
+# P: float64[N, 3] (H/D/A), y: int[N] with 0=H, 1=D, 2=A
+_EPS = 1e-15
+_ONE_HOT = np.eye(3)
 
 
-def brier_1x2(p_h: float, p_d: float, p_a: float, y: str) -> float:
-    # one-hot target
-    oh = {"H": (1.0, 0.0, 0.0), "D": (0.0, 1.0, 0.0), "A": (0.0, 0.0, 1.0)}[y]
-    return (p_h - oh[0]) ** 2 + (p_d - oh[1]) ** 2 + (p_a - oh[2]) ** 2
+def brier_1x2_batch(P: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return ((P - _ONE_HOT[y]) ** 2).sum(axis=1)
 
 
-def logloss_1x2(p_h: float, p_d: float, p_a: float, y: str) -> float:
-    p = {"H": p_h, "D": p_d, "A": p_a}[y]
-    return -math.log(_clip(p))
+def logloss_1x2_batch(P: np.ndarray, y: np.ndarray) -> np.ndarray:
+    p_true = np.take_along_axis(P, y[:, None], axis=1)[:, 0]
+    return -np.log(np.clip(p_true, _EPS, 1.0 - _EPS))
 
 
-def top1_acc(p_h: float, p_d: float, p_a: float, y: str) -> float:
-    pred = max([("H", p_h), ("D", p_d), ("A", p_a)], key=lambda t: t[1])[0]
-    return 1.0 if pred == y else 0.0
+def top1_acc_batch(P: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return (P.argmax(axis=1) == y).astype(np.float64)
 
 
 # -----------------------------
@@ -44,50 +51,34 @@ class Artifact:
 
 
 def load_artifact(path: Path) -> Artifact:
-    payload = json.loads(path.read_text(encoding="utf-8"))
+    if orjson is not None:
+        payload = orjson.loads(path.read_bytes())
+    else:
+        payload = json.loads(path.read_text(encoding="utf-8"))
     artifact_id = payload.get("artifact_id") or path.name
     return Artifact(artifact_id=artifact_id, payload=payload)
 
 
-def predict_probs_1x2_from_artifact(artifact: Artifact, row: Dict[str, Any]) -> Dict[str, float]:
+def predict_probs_1x2_batch(artifact: Artifact, rows: List[Dict[str, Any]]) -> np.ndarray:
     """
-    Wires to your existing predictor:
-      src.models.one_x_two_logreg_v1.predict_1x2_from_artifact(
-        artifact_filename=..., league_id=..., season=..., home_team_id=..., away_team_id=...
-      )
-    Expected return:
-      {"probs": {"H":..., "D":..., "A":...}, ...}
+    One artifact load and one matmul for all rows. Returns float64[N, 3] in H/D/A order.
     """
-    from src.models.one_x_two_logreg_v1 import predict_1x2_from_artifact
+    from src.models.one_x_two_logreg_v1 import predict_1x2_from_artifact_batch
 
-    league_id = row.get("league_id")
-    season = row.get("season")
-    if league_id is None or season is None:
-        raise RuntimeError("row missing league_id/season required by predictor")
+    for r in rows:
+        if r.get("league_id") is None or r.get("season") is None:
+            raise RuntimeError("row missing league_id/season required by predictor")
 
-    res = predict_1x2_from_artifact(
+    probs = predict_1x2_from_artifact_batch(
         artifact_filename=artifact.payload.get("artifact_id") or artifact.artifact_id,
-        league_id=int(league_id),
-        season=int(season),
-        home_team_id=int(row["home_team_id"]),
-        away_team_id=int(row["away_team_id"]),
+        rows=rows,
     )
 
-    probs = res.get("probs") if isinstance(res, dict) else None
-    if not isinstance(probs, dict):
-        raise RuntimeError(f"predictor returned unexpected payload (missing probs): {res}")
-
-    pH = float(probs.get("H"))
-    pD = float(probs.get("D"))
-    pA = float(probs.get("A"))
-
     # normalize defensively (just in case)
-    s = pH + pD + pA
-    if s <= 0:
-        raise RuntimeError(f"invalid probs (sum<=0): {probs}")
-    pH, pD, pA = pH / s, pD / s, pA / s
-
-    return {"H": pH, "D": pD, "A": pA}
+    s = probs.sum(axis=1, keepdims=True)
+    if np.any(s <= 0):
+        raise RuntimeError("invalid probs (sum<=0) returned by batch predictor")
+    return probs / s
 
 # -----------------------------
 # DB load: finished fixtures with teams
@@ -96,6 +87,7 @@ def load_finished_fixtures(
     league_id: Optional[int],
     seasons: Optional[List[int]],
     limit: Optional[int],
+    conn: Optional[psycopg.Connection] = None,
 ) -> List[Dict[str, Any]]:
     """
     Loads rows needed for inference & scoring.
@@ -131,43 +123,11 @@ def load_finished_fixtures(
     if limit:
         params["limit"] = limit
 
-    with pg_conn() as conn:
-        with conn.cursor() as cur:
+    # int/timestamptz columns already come back typed; dict_row gives the row dicts directly.
+    with (nullcontext(conn) if conn is not None else pg_conn()) as c:
+        with c.cursor(row_factory=dict_row) as cur:
             cur.execute(sql, params)
-            rows = cur.fetchall()
-
-    out: List[Dict[str, Any]] = []
-    for (
-        fixture_id,
-        league_id_db,
-        season_db,
-        kickoff_utc,
-        home_team_id,
-        away_team_id,
-        goals_home,
-        goals_away,
-    ) in rows:
-        out.append(
-            {
-                "fixture_id": int(fixture_id),
-                "league_id": int(league_id_db) if league_id_db is not None else None,
-                "season": int(season_db) if season_db is not None else None,
-                "kickoff_utc": kickoff_utc,
-                "home_team_id": int(home_team_id),
-                "away_team_id": int(away_team_id),
-                "goals_home": int(goals_home),
-                "goals_away": int(goals_away),
-            }
-        )
-    return out
-
-
-def outcome_1x2(goals_home: int, goals_away: int) -> str:
-    if goals_home > goals_away:
-        return "H"
-    if goals_home < goals_away:
-        return "A"
-    return "D"
+            return cur.fetchall()
 
 
 # -----------------------------
@@ -184,6 +144,7 @@ def insert_artifact_metrics(
     eval_from_utc: Optional[datetime],
     eval_to_utc: Optional[datetime],
     notes: Optional[str],
+    conn: Optional[psycopg.Connection] = None,
 ) -> None:
     sql = """
       INSERT INTO core.artifact_metrics (
@@ -209,10 +170,16 @@ def insert_artifact_metrics(
         "eval_to_utc": eval_to_utc,
         "notes": notes,
     }
-    with pg_conn() as conn:
+    if conn is not None:
+        # caller owns the transaction
         with conn.cursor() as cur:
             cur.execute(sql, params)
-        conn.commit()
+        return
+
+    with pg_conn() as c:
+        with pg_tx(c):
+            with c.cursor() as cur:
+                cur.execute(sql, params)
 
 
 # -----------------------------
@@ -237,68 +204,62 @@ def main() -> int:
 
 
     seasons = [args.season] if args.season is not None else None
-    rows = load_finished_fixtures(league_id=args.league_id, seasons=seasons, limit=args.limit)
-
-    if not rows:
-        raise SystemExit("no finished fixtures found for given filters")
-
-    eval_from = rows[0]["kickoff_utc"]
-    eval_to = rows[-1]["kickoff_utc"]
 
-    sum_brier = 0.0
-    sum_logloss = 0.0
-    sum_acc = 0.0
-    n = 0
-
-    for r in rows:
-        y = outcome_1x2(r["goals_home"], r["goals_away"])
-
-        probs = predict_probs_1x2_from_artifact(artifact, r)
-        pH = float(probs["H"])
-        pD = float(probs["D"])
-        pA = float(probs["A"])
-
-        sum_brier += brier_1x2(pH, pD, pA, y)
-        sum_logloss += logloss_1x2(pH, pD, pA, y)
-        sum_acc += top1_acc(pH, pD, pA, y)
-        n += 1
-
-    brier_avg = sum_brier / n
-    logloss_avg = sum_logloss / n
-    acc_avg = sum_acc / n
-
-    # Persist snapshot (season=NULL means global)
-    insert_artifact_metrics(
-        artifact_id=artifact.artifact_id,
-        league_id=args.league_id,
-        season=args.season,
-        n_games=n,
-        brier=brier_avg,
-        logloss=logloss_avg,
-        top1_acc=acc_avg,
-        eval_from_utc=eval_from,
-        eval_to_utc=eval_to,
-        notes=args.notes,
-    )
+    # One connection / one transaction for the fixture read and the snapshot insert.
+    with pg_conn() as conn:
+        with pg_tx(conn):
+            rows = load_finished_fixtures(league_id=args.league_id, seasons=seasons, limit=args.limit, conn=conn)
+
+            if not rows:
+                raise SystemExit("no finished fixtures found for given filters")
+
+            eval_from = rows[0]["kickoff_utc"]
+            eval_to = rows[-1]["kickoff_utc"]
+
+            P = predict_probs_1x2_batch(artifact, rows)
+            n = len(rows)
+
+            # y: 0=H, 1=D, 2=A (same order as P columns)
+            gh = np.fromiter((r["goals_home"] for r in rows), dtype=np.int64, count=n)
+            ga = np.fromiter((r["goals_away"] for r in rows), dtype=np.int64, count=n)
+            y = np.where(gh > ga, 0, np.where(gh < ga, 2, 1)).astype(np.int8)
+
+            brier_avg = float(brier_1x2_batch(P, y).mean())
+            logloss_avg = float(logloss_1x2_batch(P, y).mean())
+            acc_avg = float(top1_acc_batch(P, y).mean())
+
+            # Persist snapshot (season=NULL means global)
+            insert_artifact_metrics(
+                artifact_id=artifact.artifact_id,
+                league_id=args.league_id,
+                season=args.season,
+                n_games=n,
+                brier=brier_avg,
+                logloss=logloss_avg,
+                top1_acc=acc_avg,
+                eval_from_utc=eval_from,
+                eval_to_utc=eval_to,
+                notes=args.notes,
+                conn=conn,
+            )
 
     print("OK: inserted snapshot into core.artifact_metrics")
-    print(
-        json.dumps(
-            {
-                "artifact_id": artifact.artifact_id,
-                "league_id": args.league_id,
-                "season": args.season,
-                "n_games": n,
-                "brier": brier_avg,
-                "logloss": logloss_avg,
-                "top1_acc": acc_avg,
-                "eval_from_utc": eval_from.isoformat() if eval_from else None,
-                "eval_to_utc": eval_to.isoformat() if eval_to else None,
-                "created_at_utc": datetime.now(timezone.utc).isoformat(),
-            },
-            indent=2,
-        )
-    )
+    out = {
+        "artifact_id": artifact.artifact_id,
+        "league_id": args.league_id,
+        "season": args.season,
+        "n_games": n,
+        "brier": brier_avg,
+        "logloss": logloss_avg,
+        "top1_acc": acc_avg,
+        "eval_from_utc": eval_from.isoformat() if eval_from else None,
+        "eval_to_utc": eval_to.isoformat() if eval_to else None,
+        "created_at_utc": datetime.now(timezone.utc).isoformat(),
+    }
+    if orjson is not None:
+        print(orjson.dumps(out, option=orjson.OPT_INDENT_2).decode("utf-8"))
+    else:
+        print(json.dumps(out, indent=2))
     return 0
 
 
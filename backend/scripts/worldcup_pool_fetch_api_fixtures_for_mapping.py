@@ -99,15 +99,15 @@ def main() -> None:
     args = parser.parse_args()
 
     settings = load_settings()
-    client = ApiFootballClient(
+    with ApiFootballClient(
         base_url=settings.apifootball_base_url,
         api_key=settings.apifootball_key,
         timeout_s=30,
-    )
-    status_code, payload = client.get(
-        "/fixtures",
-        {"league": int(args.league_id), "season": int(args.season)},
-    )
+    ) as client:
+        status_code, payload = client.get(
+            "/fixtures",
+            {"league": int(args.league_id), "season": int(args.season)},
+        )
 
     if status_code >= 400:
         print(
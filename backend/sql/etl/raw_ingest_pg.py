@@ -6,20 +6,37 @@ import hashlib
 import json
 from typing import Any, Dict, Optional, Tuple
 
+from psycopg.types.json import Jsonb
+
 from src.db.pg import pg_conn, pg_tx
 
+try:
+    import orjson  # opcional: leitura mais rápida do arquivo de entrada
+except ImportError:  # pragma: no cover
+    orjson = None
+
 
 def _canonical_json(obj: Any) -> str:
     # Canonicaliza para hash estável
     return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
 
 
-def _sha256_hex(s: str) -> str:
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+def _canonical_bytes(obj: Any) -> bytes:
+    # sempre o json.dumps canônico: orjson escreve alguns floats diferente (1e-05, 1e+22,
+    # NaN) e mudaria o hash dos payloads já gravados, quebrando o dedup
+    return _canonical_json(obj).encode("utf-8")
+
+
+def _sha256_hex(b: bytes) -> str:
+    return hashlib.sha256(b).hexdigest()
 
 
 def compute_response_hash(payload: Any) -> str:
-    return _sha256_hex(_canonical_json(payload))
+    return _sha256_hex(_canonical_bytes(payload))
+
+
+def _passthrough(b: bytes) -> bytes:
+    return b
 
 
 def insert_raw_response(
@@ -37,7 +54,10 @@ def insert_raw_response(
       (inserted, response_hash)
     inserted=False quando deduplicou (UNIQUE on provider+endpoint+hash)
     """
-    response_hash = compute_response_hash(response_body)
+    # serializa 1x: os mesmos bytes canônicos alimentam o hash e o jsonb
+    # (antes: dumps p/ hash + dumps/loads p/ o parâmetro + dumps do psycopg)
+    body_json = _canonical_bytes(response_body)
+    response_hash = _sha256_hex(body_json)
 
     sql = """
     insert into raw.api_responses (
@@ -55,8 +75,8 @@ def insert_raw_response(
     params = {
         "provider": provider,
         "endpoint": endpoint,
-        "request_params": json.loads(_canonical_json(request_params)),
-        "response_body": json.loads(_canonical_json(response_body)),
+        "request_params": Jsonb(_canonical_bytes(request_params), dumps=_passthrough),
+        "response_body": Jsonb(body_json, dumps=_passthrough),
         "response_hash": response_hash,
         "http_status": http_status,
         "ok": ok,
@@ -74,6 +94,9 @@ def insert_raw_response(
 
 
 def _read_json_file(path: str) -> Any:
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
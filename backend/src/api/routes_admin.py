@@ -1,9 +1,19 @@
 from fastapi import APIRouter, Query
 from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+import json
+import sqlite3
 import traceback
+from contextlib import ExitStack
+from typing import List
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 from src.core.settings import load_settings
-from src.db.engine import connect_sqlite
+from src.db.engine import sqlite_conn
 from src.ingest.runner import (
     run_apifootball_manifest,
     run_apifootball_callplan,
@@ -11,6 +21,7 @@ from src.ingest.runner import (
 )
 
 from src.ingest.callplan_fixtures import preview_apifootball_fixture_calls_from_db
+from src.ingest.errors import IngestError
 
 from pathlib import Path
 from src.contracts.exporter import export_field_catalog
@@ -34,7 +45,8 @@ def admin_status():
             {"method": "POST", "path": "/api/admin/ingest/apifootball/fixtures-callplan", "desc": "Callplan nível 2 (fixtures -> events/lineups/statistics)"},
             {"method": "GET",  "path": "/api/admin/ingest/apifootball/fixtures-callplan", "desc": "Atalho no browser (mesmo do POST)"},
             {"method": "GET",  "path": "/api/admin/catalog/fields?endpoint=...", "desc": "Lista catálogo de campos para um endpoint_key"},
-            {"method": "GET",  "path": "/api/admin/raw/latest?endpoint=...", "desc": "Mostra o RAW mais recente salvo para um endpoint_key"}
+            {"method": "GET",  "path": "/api/admin/raw/latest?endpoint=...", "desc": "Mostra o RAW mais recente salvo para um endpoint_key"},
+            {"method": "GET",  "path": "/api/admin/raw/latest-multi?endpoints=a,b,c", "desc": "RAW mais recente de vários endpoint_keys em 1 query (dashboards)"}
         ]
     }
 
@@ -42,6 +54,9 @@ def admin_status():
 def _run_with_trace(fn):
     try:
         return fn()
+    except IngestError as ex:
+        # erro conhecido: sem custo de formatar traceback
+        raise HTTPException(status_code=ex.status_code, detail=ex.detail)
     except Exception as ex:
         tb = traceback.format_exc()
         raise HTTPException(status_code=500, detail={
@@ -80,12 +95,33 @@ def ingest_apifootball_fixtures_callplan_get():
     return {"ok": True, "method": "GET", "results": _run_with_trace(run_apifootball_fixtures_callplan)}
 
 
+def _json_bytes(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _json_response(obj) -> Response:
+    return Response(content=_json_bytes(obj), media_type="application/json")
+
+
+# linhas por lote do /catalog/fields (acima de 1 lote a resposta vira stream)
+_FIELDS_BATCH = 500
+
+
 @router.get("/catalog/fields")
 def list_fields(endpoint: str = Query(...), limit: int = 200):
     settings = load_settings()
-    con = connect_sqlite(settings.db_path)
+
+    # query + 1º lote rodam antes da resposta: erro do SQLite vira 500, não um 200 truncado.
+    # Coube num lote (o caso do limit padrão): JSON normal. Senão, stream do resto do
+    # cursor em lotes, com a conexão emprestada até o fim do corpo.
+    stack = ExitStack()
     try:
-        cur = con.execute(
+        con = stack.enter_context(sqlite_conn(settings.db_path))
+        cur = con.cursor()
+        cur.row_factory = sqlite3.Row
+        cur.execute(
             """
             select json_path, field_name, value_type, example_value, seen_count, first_seen_utc, last_seen_utc
             from api_field_catalog
@@ -95,17 +131,34 @@ def list_fields(endpoint: str = Query(...), limit: int = 200):
             """,
             (endpoint, int(limit)),
         )
-        rows = [dict(zip([c[0] for c in cur.description], r)) for r in cur.fetchall()]
-        return {"ok": True, "endpoint": endpoint, "count": len(rows), "rows": rows}
-    finally:
-        con.close()
+        first = cur.fetchmany(_FIELDS_BATCH)
+    except BaseException:
+        stack.close()
+        raise
+
+    if len(first) < _FIELDS_BATCH:
+        stack.close()
+        rows = [dict(r) for r in first]
+        return _json_response({"ok": True, "endpoint": endpoint, "count": len(rows), "rows": rows})
+
+    def body():
+        with stack:
+            yield b'{"ok":true,"endpoint":' + _json_bytes(endpoint) + b',"rows":['
+            batch, count = first, 0
+            while batch:
+                # 1 chunk HTTP por lote, não por linha
+                yield (b"," if count else b"") + b",".join(_json_bytes(dict(r)) for r in batch)
+                count += len(batch)
+                batch = cur.fetchmany(_FIELDS_BATCH)
+            yield b'],"count":' + str(count).encode() + b"}"
+
+    return StreamingResponse(body(), media_type="application/json")
 
 
 @router.get("/raw/latest")
 def latest_raw(endpoint: str = Query(...)):
     settings = load_settings()
-    con = connect_sqlite(settings.db_path)
-    try:
+    with sqlite_conn(settings.db_path) as con:
         cur = con.execute(
             """
             select id, fetched_at_utc, status_code, params_json, payload_json, error_json
@@ -120,9 +173,34 @@ def latest_raw(endpoint: str = Query(...)):
         if not row:
             return {"ok": True, "found": False}
         keys = [c[0] for c in cur.description]
-        return {"ok": True, "found": True, "row": dict(zip(keys, row))}
-    finally:
-        con.close()
+        # payload RAW pode ser grande: serializa direto (orjson quando disponível)
+        return _json_response({"ok": True, "found": True, "row": dict(zip(keys, row))})
+
+@router.get("/raw/latest-multi")
+def latest_raw_multi(endpoints: List[str] = Query(...)):
+    # aceita ?endpoints=a,b,c e/ou ?endpoints=a&endpoints=b
+    keys = list(dict.fromkeys(e.strip() for raw in endpoints for e in raw.split(",") if e.strip()))
+    if not keys:
+        return _json_response({"ok": True, "rows": {}})
+
+    settings = load_settings()
+    with sqlite_conn(settings.db_path) as con:
+        marks = ",".join("?" * len(keys))
+        cur = con.execute(
+            f"""
+            select endpoint, id, fetched_at_utc, status_code, params_json, payload_json, error_json
+            from api_raw
+            where id in (
+              select max(id) from api_raw where endpoint in ({marks}) group by endpoint
+            )
+            """,
+            keys,
+        )
+        cols = [c[0] for c in cur.description]
+        latest = {r[0]: dict(zip(cols[1:], r[1:])) for r in cur.fetchall()}
+
+    # endpoint sem RAW -> None (mesmo papel do found=False do /raw/latest)
+    return _json_response({"ok": True, "rows": {k: latest.get(k) for k in keys}})
 
 from fastapi import HTTPException
 import traceback
@@ -131,6 +209,8 @@ import traceback
 def preview_fixtures_callplan():
     try:
         return {"ok": True, "preview": preview_apifootball_fixture_calls_from_db()}
+    except IngestError as ex:
+        raise HTTPException(status_code=ex.status_code, detail=ex.detail)
     except Exception as ex:
         tb = traceback.format_exc()
         raise HTTPException(status_code=500, detail={
@@ -148,8 +228,7 @@ def export_apifootball_contract():
 @router.get("/raw/latest-by-instance")
 def raw_latest_by_instance(instance: str):
     settings = load_settings()
-    con = connect_sqlite(settings.db_path)
-    try:
+    with sqlite_conn(settings.db_path) as con:
         cur = con.execute(
             """
             select id, fetched_at_utc, status_code, params_json, payload_json, error_json, endpoint, instance_key
@@ -165,5 +244,3 @@ def raw_latest_by_instance(instance: str):
             return {"ok": True, "found": False, "instance": instance}
         cols = [c[0] for c in cur.description]
         return {"ok": True, "found": True, "row": dict(zip(cols, row))}
-    finally:
-        con.close()
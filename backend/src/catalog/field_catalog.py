@@ -16,33 +16,31 @@ def iter_json_paths(obj: Any, path: str = "$") -> Iterable[Tuple[str, str, str,
     Yields tuples: (json_path, field_name, value_type, example_value)
     value_type: string|number|object|array|boolean|null|unknown
     """
-    if obj is None:
-        yield (path, path.split(".")[-1], "null", "null")
-        return
-
-    if isinstance(obj, bool):
-        yield (path, path.split(".")[-1], "boolean", str(obj).lower())
-        return
-
-    if isinstance(obj, (int, float)):
-        yield (path, path.split(".")[-1], "number", _truncate(str(obj)))
-        return
-
-    if isinstance(obj, str):
-        yield (path, path.split(".")[-1], "string", _truncate(obj))
-        return
-
-    if isinstance(obj, list):
-        yield (path, path.split(".")[-1], "array", f"array(len={len(obj)})")
-        for i, item in enumerate(obj[:3]):  # amostra para não explodir
-            yield from iter_json_paths(item, f"{path}[{i}]")
-        return
-
-    if isinstance(obj, dict):
-        yield (path, path.split(".")[-1], "object", "object")
-        for k, v in obj.items():
-            safe_key = k.replace('"', '\\"')
-            yield from iter_json_paths(v, f'{path}["{safe_key}"]')
-        return
-
-    yield (path, path.split(".")[-1], "unknown", _truncate(str(obj)))
+    # pilha explícita (pré-ordem, mesma ordem da versão recursiva) em vez de
+    # 1 generator + yield from por nível
+    stack = [(obj, path)]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        obj, path = pop()
+        name = path[path.rfind(".") + 1 :]
+
+        if obj is None:
+            yield (path, name, "null", "null")
+        elif isinstance(obj, bool):
+            yield (path, name, "boolean", "true" if obj else "false")
+        elif isinstance(obj, (int, float)):
+            yield (path, name, "number", _truncate(str(obj)))
+        elif isinstance(obj, str):
+            yield (path, name, "string", _truncate(obj))
+        elif isinstance(obj, list):
+            yield (path, name, "array", "array(len=%d)" % len(obj))
+            # amostra dos 3 primeiros (para não explodir), por índice, sem cópia
+            for i in range(min(3, len(obj)) - 1, -1, -1):
+                push((obj[i], "%s[%d]" % (path, i)))
+        elif isinstance(obj, dict):
+            yield (path, name, "object", "object")
+            for k, v in reversed(list(obj.items())):
+                push((v, '%s["%s"]' % (path, k.replace('"', '\\"'))))
+        else:
+            yield (path, name, "unknown", _truncate(str(obj)))
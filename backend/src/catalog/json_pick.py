@@ -1,28 +1,29 @@
 from __future__ import annotations
 
+import calendar
+import heapq
 from datetime import datetime
-from typing import Any, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 
-def pick(obj: Any, path: str) -> Any:
+@lru_cache(maxsize=256)
+def compile_path(path: str) -> Tuple[Union[str, int], ...]:
     """
-    Suporta um subset mínimo de JSONPath no formato:
-      $["key"]["key2"]
-      $["arr"][0]["key"]
-    Sem filtros, sem wildcards.
+    Compila o path (subset de JSONPath aceito por pick) em uma tupla de chaves/índices:
+      $["response"][0]["fixture"]["id"] -> ("response", 0, "fixture", "id")
     """
     if not path.startswith("$"):
         raise ValueError(f"Invalid path: {path}")
 
-    cur = obj
+    plan: List[Union[str, int]] = []
     i = 1
     while i < len(path):
-        if path[i:].startswith('["'):
+        if path.startswith('["', i):
             j = path.find('"]', i)
             if j == -1:
                 raise ValueError(f"Invalid path segment: {path[i:]}")
-            key = path[i + 2 : j]
-            cur = cur[key]
+            plan.append(path[i + 2 : j])
             i = j + 2
             continue
 
@@ -30,8 +31,7 @@ def pick(obj: Any, path: str) -> Any:
             j = path.find("]", i)
             if j == -1:
                 raise ValueError(f"Invalid index segment: {path[i:]}")
-            idx = int(path[i + 1 : j])
-            cur = cur[idx]
+            plan.append(int(path[i + 1 : j]))
             i = j + 1
             continue
 
@@ -40,9 +40,26 @@ def pick(obj: Any, path: str) -> Any:
             continue
 
         raise ValueError(f"Unsupported path syntax at: {path[i:]}")
+    return tuple(plan)
+
+
+def apply_compiled(obj: Any, plan: Tuple[Union[str, int], ...]) -> Any:
+    cur = obj
+    for k in plan:
+        cur = cur[k]
     return cur
 
 
+def pick(obj: Any, path: str) -> Any:
+    """
+    Suporta um subset mínimo de JSONPath no formato:
+      $["key"]["key2"]
+      $["arr"][0]["key"]
+    Sem filtros, sem wildcards.
+    """
+    return apply_compiled(obj, compile_path(path))
+
+
 def pick_season_year(seasons_list: Any, mode: str = "latest") -> Optional[int]:
     """
     seasons_list: lista de dicts com ['year'].
@@ -60,6 +77,15 @@ def pick_season_year(seasons_list: Any, mode: str = "latest") -> Optional[int]:
 
 
 def _parse_iso(dt: str) -> float:
+    # Fast path: formato fixo do API-Football (YYYY-MM-DDTHH:MM:SS + "Z"/"+00:00").
+    if len(dt) >= 20 and dt[19:] in ("Z", "+00:00") and dt[10] == "T":
+        try:
+            return float(calendar.timegm((
+                int(dt[0:4]), int(dt[5:7]), int(dt[8:10]),
+                int(dt[11:13]), int(dt[14:16]), int(dt[17:19]),
+            )))
+        except ValueError:
+            pass
     try:
         return datetime.fromisoformat(dt.replace("Z", "+00:00")).timestamp()
     except Exception:
@@ -79,27 +105,35 @@ def pick_top_fixture_ids(
     if not isinstance(items, list):
         return []
 
-    scored: List[tuple[float, int]] = []
-    for it in items:
+    # compila os paths 1x fora do loop (path inválido = nenhum item aproveitável, como antes)
+    try:
+        fid_plan = compile_path(fixture_id_path)
+        fdt_plan = compile_path(fixture_date_path)
+    except ValueError:
+        return []
+
+    # 1 entrada por fixture_id: a que viria primeiro na ordenação estável
+    # (melhor score; empate -> ordem original)
+    latest = order == "latest"
+    best: Dict[int, Tuple[float, int]] = {}
+    for idx, it in enumerate(items):
         try:
-            fid = pick(it, fixture_id_path)
-            fdt = pick(it, fixture_date_path)
+            fid = apply_compiled(it, fid_plan)
+            fdt = apply_compiled(it, fdt_plan)
             if not isinstance(fid, int):
                 continue
             score = _parse_iso(fdt) if isinstance(fdt, str) else 0.0
-            scored.append((score, fid))
         except Exception:
             continue
-
-    scored.sort(key=lambda x: x[0], reverse=(order == "latest"))
-
-    out: List[int] = []
-    seen = set()
-    for _, fid in scored:
-        if fid in seen:
-            continue
-        out.append(fid)
-        seen.add(fid)
-        if len(out) >= max_n:
-            break
-    return out
+        prev = best.get(fid)
+        if prev is None or (score > prev[0] if latest else score < prev[0]):
+            best[fid] = (score, idx)
+
+    # top-N via heap em vez de ordenar a lista toda (max_n << len(items));
+    # max_n <= 0 ainda devolve 1 id, como o loop antigo.
+    n = max(1, int(max_n))
+    if latest:
+        top = heapq.nlargest(n, best.items(), key=lambda kv: (kv[1][0], -kv[1][1]))
+    else:
+        top = heapq.nsmallest(n, best.items(), key=lambda kv: kv[1])
+    return [fid for fid, _ in top]
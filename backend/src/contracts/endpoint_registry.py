@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.core.settings import CONFIG_DIR
 
@@ -25,15 +25,27 @@ def _find_def(registry: Dict[str, Any], path: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+_IDENTITY_PARAMS_CACHE: Dict[str, Tuple[str, ...]] | None = None
+
+
+def _identity_params_by_path() -> Dict[str, Tuple[str, ...]]:
+    # registry é read-only: indexa path -> identity_params 1x (mesma regra do _find_def: 1º match vence)
+    global _IDENTITY_PARAMS_CACHE
+    if _IDENTITY_PARAMS_CACHE is None:
+        out: Dict[str, Tuple[str, ...]] = {}
+        for e in load_registry().get("endpoints", []):
+            out.setdefault(e.get("path"), tuple(e.get("identity_params", [])))
+        _IDENTITY_PARAMS_CACHE = out
+    return _IDENTITY_PARAMS_CACHE
+
+
 def make_instance_key(provider: str, path: str, params: Dict[str, Any]) -> str:
     """
     instance_key determinística:
       apifootball:/fixtures|league=886|season=2024
       apifootball:/fixtures/events|fixture=1146680
     """
-    registry = load_registry()
-    d = _find_def(registry, path)
-    identity_params: List[str] = (d or {}).get("identity_params", [])
+    identity_params = _identity_params_by_path().get(path, ())
 
     parts: List[str] = [f"{provider}:{path}"]
     for k in identity_params:
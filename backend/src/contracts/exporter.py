@@ -4,16 +4,30 @@ import json
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict
 
 from src.core.settings import load_settings
 from src.db.engine import connect_sqlite
 
+try:
+    import orjson  # opcional
+except ImportError:  # pragma: no cover
+    orjson = None
+
 
 def _utcnow_iso() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
 
+def _dumps_indented(obj: Any, indent: int) -> str:
+    # mesmo formato do json.dumps(..., indent=2) do arquivo inteiro, deslocado para o nível `indent`
+    if orjson is not None:
+        text = orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    else:
+        text = json.dumps(obj, ensure_ascii=False, indent=2)
+    return text.replace("\n", "\n" + " " * indent)
+
+
 def export_field_catalog(provider: str, out_path: Path, limit_per_endpoint: int = 5000) -> Dict[str, Any]:
     """
     Exporta api_field_catalog para JSON versionável.
@@ -21,8 +35,30 @@ def export_field_catalog(provider: str, out_path: Path, limit_per_endpoint: int
     - out_path: ex. backend/contracts/apifootball.field_catalog.v1.json
     """
     settings = load_settings()
+    limit = max(0, int(limit_per_endpoint))
+
+    # Escreve em streaming (mesmo conteúdo/formatação do json.dumps indent=2 de antes):
+    # contagens por endpoint primeiro (o "count" vem antes de "fields"), depois as linhas
+    # já limitadas por endpoint no SQL, lidas em lotes.
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+
     con = connect_sqlite(settings.db_path)
     try:
+        # contagens e linhas no mesmo snapshot (1 transação de leitura): escrita concorrente
+        # entre os 2 SELECTs desalinharia as linhas dos endpoints (as linhas seguem as contagens)
+        con.execute("begin")
+        counts = con.execute(
+            """
+            select endpoint, min(count(*), ?)
+            from api_field_catalog
+            where provider = ?
+            group by endpoint
+            order by endpoint
+            """,
+            (limit, provider),
+        ).fetchall()
+
         cur = con.execute(
             """
             select endpoint,
@@ -33,51 +69,63 @@ def export_field_catalog(provider: str, out_path: Path, limit_per_endpoint: int
                    seen_count,
                    first_seen_utc,
                    last_seen_utc
-            from api_field_catalog
-            where provider = ?
+            from (
+              select *,
+                     row_number() over (partition by endpoint order by json_path) as rn
+              from api_field_catalog
+              where provider = ?
+            )
+            where rn <= ?
             order by endpoint, json_path
             """,
-            (provider,),
+            (provider, limit),
         )
-        rows = cur.fetchall()
-        cols = [c[0] for c in cur.description]
-    finally:
-        con.close()
-
-    # Agrupa por endpoint
-    by_endpoint: Dict[str, List[Dict[str, Any]]] = {}
-    for r in rows:
-        rec = dict(zip(cols, r))
-        endpoint = rec.pop("endpoint")
-        by_endpoint.setdefault(endpoint, []).append(rec)
+        cols = [c[0] for c in cur.description][1:]
 
-    # Aplica limite (segurança)
-    for ep, items in list(by_endpoint.items()):
-        if len(items) > limit_per_endpoint:
-            by_endpoint[ep] = items[:limit_per_endpoint]
+        header = {
+            "schema": "field_catalog.v1",
+            "provider": provider,
+            "exported_at_utc": _utcnow_iso(),
+            "db_path": settings.db_path,
+        }
 
-    payload = {
-        "schema": "field_catalog.v1",
-        "provider": provider,
-        "exported_at_utc": _utcnow_iso(),
-        "db_path": settings.db_path,
-        "endpoints": [
-            {
-                "endpoint": ep,
-                "count": len(items),
-                "fields": items,
-            }
-            for ep, items in sorted(by_endpoint.items(), key=lambda x: x[0])
-        ],
-    }
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(_dumps_indented(header, 0)[:-2] + ",\n")
+            if not counts:
+                f.write('  "endpoints": []\n}')
+            else:
+                f.write('  "endpoints": [\n')
+                rows = iter(())
+                for i, (ep, count) in enumerate(counts):
+                    f.write("    {\n")
+                    f.write(f'      "endpoint": {_dumps_indented(ep, 0)},\n')
+                    f.write(f'      "count": {count},\n')
+                    if count == 0:
+                        f.write('      "fields": []\n')
+                    else:
+                        f.write('      "fields": [\n')
+                        for j in range(count):
+                            r = next(rows, None)
+                            if r is None:
+                                batch = cur.fetchmany(1000)
+                                rows = iter(batch)
+                                r = next(rows)
+                            rec = dict(zip(cols, r[1:]))
+                            f.write("        " + _dumps_indented(rec, 8) + (",\n" if j < count - 1 else "\n"))
+                        f.write("      ]\n")
+                    f.write("    },\n" if i < len(counts) - 1 else "    }\n")
+                f.write("  ]\n}")
+    finally:
+        if con.in_transaction:
+            con.rollback()
+        con.close()
 
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path.replace(out_path)
 
     return {
         "ok": True,
         "provider": provider,
         "out_path": str(out_path),
-        "endpoints": len(payload["endpoints"]),
-        "fields_total": sum(e["count"] for e in payload["endpoints"]),
+        "endpoints": len(counts),
+        "fields_total": sum(c for _, c in counts),
     }
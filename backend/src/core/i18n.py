@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping
 
 from .settings import I18N_DIR, Settings
 
@@ -13,22 +14,20 @@ def load_lang(lang: str) -> Dict[str, Any]:
 class I18N:
     def __init__(self, settings: Settings):
         self.settings = settings
-        self.cache: Dict[str, Dict[str, Any]] = {}
+        # catálogos são read-only: carrega todos os idiomas suportados 1x
+        self.cache: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+            lang: MappingProxyType(load_lang(lang))
+            for lang in {*settings.supported_langs, settings.default_lang}
+        })
+        # .get já resolvido por idioma: t() faz 1 lookup do idioma + 1 chamada
+        self._fast: Dict[str, Callable[..., Any]] = {lang: c.get for lang, c in self.cache.items()}
+        self._default_get = self._fast[settings.default_lang]
 
     def t(self, key: str, lang: str | None = None) -> str:
-        lang = (lang or self.settings.default_lang)
-        if lang not in self.settings.supported_langs:
-            lang = self.settings.default_lang
-
-        if lang not in self.cache:
-            self.cache[lang] = load_lang(lang)
-
-        # fallback: default_lang
-        value = self.cache[lang].get(key)
+        # idioma None/fora de supported_langs cai no default_lang
+        value = self._fast.get(lang, self._default_get)(key)
         if value is not None:
             return str(value)
 
-        if self.settings.default_lang not in self.cache:
-            self.cache[self.settings.default_lang] = load_lang(self.settings.default_lang)
-
-        return str(self.cache[self.settings.default_lang].get(key, key))
+        # fallback: default_lang
+        return str(self._default_get(key, key))
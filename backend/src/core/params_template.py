@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def compile_params(template: Dict[str, Any]) -> Callable[[Any, Any], Dict[str, Any]]:
+    """
+    Pré-processa um template de params ({league_id}/{season}) uma vez; devolve fmt(league_id, season),
+    que monta um dict novo a cada chamada.
+      {"league": "{league_id}", "season": "{season}"} -> fmt(39, 2024) == {"league": "39", "season": "2024"}
+    """
+    # (key, valor, blocos) -- blocos: split por "{league_id}" e, dentro, por "{season}"
+    compiled: List[Tuple[str, Any, Optional[List[List[str]]]]] = []
+    for k, v in (template or {}).items():
+        if isinstance(v, str) and ("{league_id}" in v or "{season}" in v):
+            compiled.append((k, v, [p.split("{season}") for p in v.split("{league_id}")]))
+        else:
+            compiled.append((k, v, None))
+
+    def fmt(league_id: Any, season: Any) -> Dict[str, Any]:
+        l, s = str(league_id), str(season)
+        return {
+            k: v if blocks is None else l.join(s.join(b) for b in blocks)
+            for k, v, blocks in compiled
+        }
+
+    return fmt
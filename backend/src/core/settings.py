@@ -1,6 +1,7 @@
 import json
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -129,6 +130,9 @@ class Settings:
     app_defaults: Dict[str, Any]
 
 
+# configs/env são lidos 1x por processo (load_settings é chamado por request em várias rotas).
+# Em testes/scripts que mexem no env: load_settings.cache_clear().
+@lru_cache(maxsize=1)
 def load_settings() -> Settings:
     load_dotenv(dotenv_path=BASE_DIR / ".env", override=False)
 
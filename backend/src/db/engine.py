@@ -1,21 +1,44 @@
 from __future__ import annotations
 
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, Optional, Set
 
 
-def connect_sqlite(db_path: str) -> sqlite3.Connection:
+def connect_sqlite(db_path: str, *, check_same_thread: bool = True) -> sqlite3.Connection:
     """
     Conexão única com SQLite (WAL) + schema idempotente.
     """
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-    con = sqlite3.connect(db_path)
+    con = sqlite3.connect(db_path, check_same_thread=check_same_thread)
     con.execute("pragma journal_mode=WAL;")
+    # WAL + NORMAL: fsync só no checkpoint (durável contra crash do processo)
+    con.execute("pragma synchronous=NORMAL;")
+    con.execute("pragma busy_timeout=5000;")
+    con.execute("pragma cache_size=-20000;")  # ~20 MB
+    con.execute("pragma temp_store=MEMORY;")
+    con.execute("pragma mmap_size=268435456;")  # 256 MB
+    con.execute("pragma wal_autocheckpoint=1000;")
+    con.execute("pragma journal_size_limit=67108864;")  # 64 MB
     con.execute("pragma foreign_keys=ON;")
-    apply_schema(con)
+
+    if db_path not in _SCHEMA_APPLIED:
+        # outro processo já migrou este arquivo? (user_version persiste no disco)
+        if con.execute("pragma user_version").fetchone()[0] < SCHEMA_VERSION:
+            apply_schema(con)
+        _SCHEMA_APPLIED.add(db_path)
     return con
 
+
+# Subir a cada mudança em apply_schema (senão bancos já migrados não a recebem).
+SCHEMA_VERSION = 1
+
+_SCHEMA_APPLIED: Set[str] = set()
+
+
 def apply_schema(con: sqlite3.Connection) -> None:
     """
     Cria tabelas base (se não existirem) e aplica migrações de forma segura.
@@ -76,5 +99,76 @@ def apply_schema(con: sqlite3.Connection) -> None:
     con.execute("create index if not exists idx_catalog_endpoint on api_field_catalog(endpoint)")
     con.execute("create unique index if not exists ux_catalog_field on api_field_catalog(provider, endpoint, json_path)")
 
+    con.execute(f"pragma user_version={int(SCHEMA_VERSION)}")
     con.commit()
 
+
+# ----------------------------
+# Engine: pool de leitores (WAL)
+# ----------------------------
+
+SQLITE_POOL_SIZE = 8
+
+
+def _connect_reader(db_path: str) -> sqlite3.Connection:
+    # read-only: nunca disputa o lock de escrita (WAL deixa ler durante o write)
+    con = sqlite3.connect(f"file:{Path(db_path).as_posix()}?mode=ro", uri=True, check_same_thread=False)
+    con.execute("pragma busy_timeout=5000;")
+    con.execute("pragma cache_size=-20000;")
+    con.execute("pragma temp_store=MEMORY;")
+    con.execute("pragma mmap_size=268435456;")
+    return con
+
+
+class SqliteEngine:
+    """
+    Pool LIFO de conexões read-only. Quem escreve (ingest, callplans) abre a própria
+    conexão com connect_sqlite; WAL + busy_timeout serializam as escritas.
+    check_same_thread=False: conexões podem trocar de thread, mas nunca são
+    usadas por duas ao mesmo tempo.
+    """
+
+    def __init__(self, db_path: str, readers: int = SQLITE_POOL_SIZE) -> None:
+        self.db_path = db_path
+        # cria o arquivo e aplica o schema (1x por processo): leitor read-only não consegue
+        connect_sqlite(db_path).close()
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=readers)
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        try:
+            con = self._readers.get_nowait()
+        except queue.Empty:
+            con = _connect_reader(self.db_path)
+
+        try:
+            yield con
+        finally:
+            # leitura nunca deixa snapshot aberto (senão segura o checkpoint do WAL)
+            if con.in_transaction:
+                con.rollback()
+            try:
+                self._readers.put_nowait(con)
+            except queue.Full:
+                con.close()
+
+
+_SQLITE_ENGINES: Dict[str, SqliteEngine] = {}
+_SQLITE_ENGINES_LOCK = threading.Lock()
+
+
+def sqlite_engine(db_path: str) -> SqliteEngine:
+    eng = _SQLITE_ENGINES.get(db_path)
+    if eng is None:
+        with _SQLITE_ENGINES_LOCK:
+            eng = _SQLITE_ENGINES.get(db_path)
+            if eng is None:
+                eng = _SQLITE_ENGINES[db_path] = SqliteEngine(db_path)
+    return eng
+
+
+def sqlite_conn(db_path: str):
+    """
+    Conexão de leitura emprestada do engine do db_path (rotas admin).
+    """
+    return sqlite_engine(db_path).read()
@@ -45,11 +45,11 @@ def migrate(*, migrations_dir: Optional[str] = None) -> MigrateResult:
             cur.execute("SELECT version FROM core.schema_migrations;")
             done = {row[0] for row in cur.fetchall()}
 
-            for f in files:
-                version = f.name  # ex: 014_core_team_season_stats.sql
-                if version in done:
-                    continue
+            # só as pendentes (ex: 014_core_team_season_stats.sql); as já aplicadas nem são abertas
+            pending = [f for f in files if f.name not in done]
 
+            for f in pending:
+                version = f.name
                 sql = f.read_text(encoding="utf-8")
                 cur.execute(sql)
                 cur.execute(
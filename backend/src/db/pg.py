@@ -1,10 +1,15 @@
 # backend/src/db/pg.py
 from __future__ import annotations
 
+import atexit
+import os
+import threading
 from contextlib import contextmanager
 from typing import Iterator, Optional
 
 import psycopg
+from psycopg.pq import TransactionStatus
+from psycopg_pool import ConnectionPool
 
 from src.core.settings import load_settings
 
@@ -16,17 +21,96 @@ def _require_database_url() -> str:
     return s.database_url
 
 
+def _env_prepare_threshold() -> Optional[int]:
+    # psycopg3 prepara sozinho um statement depois de N execuções na mesma conexão
+    # (executemany dos upserts, inserts repetidos). "none" desliga (ex: pgbouncer em
+    # transaction mode, onde prepared statements não sobrevivem entre transações).
+    v = (os.getenv("PG_PREPARE_THRESHOLD") or "5").strip().lower()
+    if v in ("none", "off", "-1"):
+        return None
+    return int(v)
+
+
+_PREPARE_THRESHOLD = _env_prepare_threshold()
+
+# Para statements sabidamente quentes: cur.execute(..., prepare=PREPARE_HOT) prepara
+# já na 1ª execução na conexão. Desligado junto com PG_PREPARE_THRESHOLD=none.
+PREPARE_HOT = _PREPARE_THRESHOLD is not None
+
+
 def connect_pg(url: Optional[str] = None) -> psycopg.Connection:
     dsn = url or _require_database_url()
-    return psycopg.connect(dsn, connect_timeout=5)
+    return psycopg.connect(dsn, connect_timeout=5, prepare_threshold=_PREPARE_THRESHOLD)
+
+
+# ----------------------------
+# Pool (DATABASE_URL padrão)
+# ----------------------------
+
+# PG_POOL_MAX=0 desliga o pool (volta a abrir 1 conexão por pg_conn()).
+# PG_POOL_MIN: conexões mantidas abertas (jobs longos, ex. backfill, podem subir).
+_POOL_MAX = int(os.getenv("PG_POOL_MAX", "20"))
+_POOL_MIN = max(0, min(int(os.getenv("PG_POOL_MIN", "2")), _POOL_MAX))
+
+_POOL: Optional[ConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def pool_max_size() -> int:
+    # 0 = pool desligado (cada pg_conn() abre a sua conexão)
+    return max(0, _POOL_MAX)
+
+
+def _get_pool() -> ConnectionPool:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                pool = ConnectionPool(
+                    conninfo=_require_database_url(),
+                    min_size=_POOL_MIN,
+                    max_size=_POOL_MAX,
+                    kwargs={"connect_timeout": 5, "prepare_threshold": _PREPARE_THRESHOLD},
+                    check=ConnectionPool.check_connection,
+                    open=True,
+                )
+                atexit.register(pool.close)
+                _POOL = pool
+    return _POOL
+
+
+def _release(pool: ConnectionPool, conn: psycopg.Connection) -> None:
+    # Mesmo contrato do close(): o que não foi commitado é descartado.
+    # Fazemos o rollback aqui para o pool não logar warning a cada leitura.
+    # Conexão quebrada no meio da transação faz o rollback levantar: o putconn roda
+    # no finally mesmo assim (o pool descarta conexão quebrada), senão o slot vaza.
+    try:
+        status = conn.info.transaction_status
+        if status in (TransactionStatus.INTRANS, TransactionStatus.INERROR):
+            conn.rollback()
+            status = conn.info.transaction_status
+        if status == TransactionStatus.IDLE and conn.autocommit:
+            conn.autocommit = False
+    finally:
+        pool.putconn(conn)
+
 
 @contextmanager
 def pg_conn(url: Optional[str] = None) -> Iterator[psycopg.Connection]:
-    conn = connect_pg(url)
+    if url is not None or _POOL_MAX <= 0:
+        conn = connect_pg(url)
+        try:
+            yield conn
+        finally:
+            conn.close()
+        return
+
+    pool = _get_pool()
+    conn = pool.getconn()
     try:
         yield conn
     finally:
-        conn.close()
+        _release(pool, conn)
 
 
 @contextmanager
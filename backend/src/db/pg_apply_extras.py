@@ -11,9 +11,8 @@ def main():
         with pg_tx(conn):
             with conn.cursor() as cur:
                 for rel in FILES:
-                    sql = (BASE_DIR / rel).read_text(encoding="utf-8")
-                    for stmt in [s.strip() for s in sql.split(";") if s.strip()]:
-                        cur.execute(stmt + ";")
+                    # arquivo inteiro (multi-statement, sem parâmetros) num execute só
+                    cur.execute((BASE_DIR / rel).read_text(encoding="utf-8"))
     print("OK: applied extras")
 
 if __name__ == "__main__":
@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Iterable
 
 from src.db.pg import pg_conn, pg_tx
 from src.core.settings import BASE_DIR
@@ -16,20 +15,12 @@ FILES = (
 )
 
 
-def _split_statements(sql: str) -> Iterable[str]:
-    # Suficiente para nossos arquivos (sem functions/DO $$)
-    parts = sql.split(";")
-    for p in parts:
-        stmt = p.strip()
-        if stmt:
-            yield stmt + ";"
-
-
 def apply_sql_file(conn, path: Path) -> None:
+    # Arquivo inteiro num execute só: sem parâmetros o psycopg manda em simple query,
+    # e o Postgres faz o parse (aceita ; dentro de DO $$ / functions / strings).
     sql = path.read_text(encoding="utf-8")
     with conn.cursor() as cur:
-        for stmt in _split_statements(sql):
-            cur.execute(stmt)
+        cur.execute(sql)
 
 
 def main() -> None:
@@ -1,20 +1,36 @@
 # backend/src/etl/backfill_multiseason_pg.py
 from __future__ import annotations
 
-from psycopg.types.json import Json
+import psycopg
 
 import argparse
 import json
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from tqdm import tqdm  # <-- Opção B: barra de progresso
 
+try:
+    import orjson  # opcional
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from src.core.params_template import compile_params
 from src.core.settings import load_settings, CONFIG_DIR
-from src.db.pg import pg_conn, pg_tx
+from src.db.pg import PREPARE_HOT, pg_conn, pg_tx
 from src.provider.apifootball.client import ApiFootballClient
 
-from src.etl.raw_ingest_pg import insert_raw_response
+from src.etl.raw_ingest_pg import (
+    _canonical_bytes,
+    _insert_raw_params_bulk,
+    _prejson,
+    _raw_response_params,
+)
 from src.etl.core_etl_pg import (
     LEAGUES_UPSERT_SQL,
     TEAMS_UPSERT_SQL,
@@ -23,6 +39,7 @@ from src.etl.core_etl_pg import (
     map_team,
     map_fixture,
     _iter_response_items,  # ok usar internamente aqui, pois é seu próprio módulo
+    _apply_upserts_cur,
 )
 
 DEFAULT_ENDPOINTS: Dict[str, Dict[str, Any]] = {
@@ -40,31 +57,34 @@ DEFAULT_ENDPOINTS: Dict[str, Dict[str, Any]] = {
 
 
 def _read_json(path) -> Dict[str, Any]:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
     return json.loads(path.read_text(encoding="utf-8"))
 
 
-def _fmt_params(template: Dict[str, Any], league_id: int, season: int) -> Dict[str, Any]:
-    out: Dict[str, Any] = {}
-    for k, v in (template or {}).items():
-        if isinstance(v, str):
-            v = v.replace("{league_id}", str(league_id)).replace("{season}", str(season))
-        out[k] = v
-    return out
-
+def _get_checkpoint(
+    provider: str,
+    endpoint: str,
+    league_id: int,
+    season: int,
+    *,
+    conn: Optional[psycopg.Connection] = None,
+) -> Dict[str, Any]:
+    if conn is None:
+        with pg_conn() as conn:
+            return _get_checkpoint(provider, endpoint, league_id, season, conn=conn)
 
-def _get_checkpoint(provider: str, endpoint: str, league_id: int, season: int) -> Dict[str, Any]:
     sql = """
     select last_page_done, total_pages, status, meta
     from raw.backfill_checkpoint
     where provider=%(p)s and endpoint=%(e)s and league_id=%(l)s and season=%(s)s
     """
-    with pg_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, {"p": provider, "e": endpoint, "l": league_id, "s": season})
-            row = cur.fetchone()
-            if not row:
-                return {"last_page_done": 0, "total_pages": None, "status": "new", "meta": {}}
-            return {"last_page_done": row[0], "total_pages": row[1], "status": row[2], "meta": row[3] or {}}
+    with conn.cursor() as cur:
+        cur.execute(sql, {"p": provider, "e": endpoint, "l": league_id, "s": season}, prepare=PREPARE_HOT)
+        row = cur.fetchone()
+        if not row:
+            return {"last_page_done": 0, "total_pages": None, "status": "new", "meta": {}}
+        return {"last_page_done": row[0], "total_pages": row[1], "status": row[2], "meta": row[3] or {}}
 
 
 def _upsert_checkpoint(
@@ -76,7 +96,23 @@ def _upsert_checkpoint(
     total_pages: Optional[int],
     status: str,
     meta: Dict[str, Any],
+    *,
+    conn: Optional[psycopg.Connection] = None,
 ) -> None:
+    """
+    conn: conexão do chamador (sem commit aqui; o chamador controla a transação).
+    """
+    if conn is None:
+        with pg_conn() as conn:
+            with pg_tx(conn):
+                _async_commit(conn)
+                _upsert_checkpoint(
+                    provider, endpoint, league_id, season,
+                    last_page_done, total_pages, status, meta,
+                    conn=conn,
+                )
+        return
+
     sql = """
     insert into raw.backfill_checkpoint (
       provider, endpoint, league_id, season,
@@ -93,57 +129,71 @@ def _upsert_checkpoint(
       meta = excluded.meta,
       updated_at_utc = now();
     """
-    with pg_conn() as conn:
-        with pg_tx(conn):
-            with conn.cursor() as cur:
-                cur.execute(
-                    sql,
-                    {
-                        "p": provider,
-                        "e": endpoint,
-                        "l": league_id,
-                        "s": season,
-                        "lp": last_page_done,
-                        "tp": total_pages,
-                        "st": status,
-                        "m": Json(meta),
-                    },
-                )
+    with conn.cursor() as cur:
+        cur.execute(
+            sql,
+            {
+                "p": provider,
+                "e": endpoint,
+                "l": league_id,
+                "s": season,
+                "lp": last_page_done,
+                "tp": total_pages,
+                "st": status,
+                "m": _prejson(_canonical_bytes(meta)),
+            },
+            prepare=PREPARE_HOT,
+        )
+
+
+def _async_commit(conn: psycopg.Connection) -> None:
+    # só para a transação corrente: o commit não espera o flush do WAL. Num crash do
+    # server perde-se no máx. ~3x wal_writer_delay de commits, inteiros (sem corromper).
+    conn.execute("set local synchronous_commit = off")
+
+
+_CORE_MAPPERS = {
+    "leagues": (map_league, LEAGUES_UPSERT_SQL),
+    "teams": (map_team, TEAMS_UPSERT_SQL),
+    "fixtures": (map_fixture, FIXTURES_UPSERT_SQL),
+}
 
 
-def _apply_core_from_payload(endpoint: str, payload: Dict[str, Any]) -> int:
+def _apply_core_from_payload(
+    endpoint: str,
+    payload: Dict[str, Any],
+    *,
+    conn: Optional[psycopg.Connection] = None,
+) -> int:
     """
     Aplica no CORE imediatamente para você ver o banco enchendo,
     sem depender de "limit" varrendo RAW.
+    conn: conexão do chamador (sem commit aqui).
     """
-    items = list(_iter_response_items(payload))
-
-    if endpoint == "leagues":
-        mapped = [map_league(it) for it in items]
-        mapped = [m for m in mapped if m is not None]
-        sql = LEAGUES_UPSERT_SQL
-    elif endpoint == "teams":
-        mapped = [map_team(it) for it in items]
-        mapped = [m for m in mapped if m is not None]
-        sql = TEAMS_UPSERT_SQL
-    elif endpoint == "fixtures":
-        mapped = [map_fixture(it) for it in items]
-        mapped = [m for m in mapped if m is not None]
-        sql = FIXTURES_UPSERT_SQL
-    else:
+    spec = _CORE_MAPPERS.get(endpoint)
+    if spec is None:
         return 0
+    map_fn, sql = spec
+
+    # 1 passada: mapeia e filtra direto do gerador
+    mapped = [m for it in _iter_response_items(payload) if (m := map_fn(it)) is not None]
 
     if not mapped:
         return 0
 
-    with pg_conn() as conn:
-        with pg_tx(conn):
-            with conn.cursor() as cur:
-                n = 0
-                for row in mapped:
-                    cur.execute(sql, row)
-                    n += 1
-                return n
+    if conn is None:
+        with pg_conn() as conn:
+            with pg_tx(conn):
+                return _apply_core_rows(conn, sql, mapped)
+    return _apply_core_rows(conn, sql, mapped)
+
+
+def _apply_core_rows(conn: psycopg.Connection, sql: str, mapped: List[Dict[str, Any]]) -> int:
+    # mesmo caminho do run_core_etl: executemany (binds em pipeline) ou, em lotes
+    # grandes, COPY para staging + INSERT ... ON CONFLICT
+    with conn.cursor() as cur:
+        _apply_upserts_cur(cur, sql, mapped)
+    return len(mapped)
 
 
 def _parse_int_csv_or_range(value: str) -> List[int]:
@@ -199,21 +249,25 @@ def _resolve_league_ids(
     src = plan.get("league_source") or {}
     mode = str(mode_override or src.get("mode", "ids")).strip()
     max_leagues = int(max_leagues_override or src.get("max_leagues", 50))
+    return list(_league_ids_cached(mode, max_leagues, tuple(src.get("league_ids") or ())))
+
 
+@lru_cache(maxsize=32)
+def _league_ids_cached(mode: str, max_leagues: int, configured_ids: Tuple[Any, ...]) -> Tuple[int, ...]:
+    # memoizado por processo: runs repetidas não reabrem conexão para a mesma lista
     if mode == "ids":
-        ids = src.get("league_ids") or []
-        ids = [int(x) for x in ids if isinstance(x, (int, str)) and str(x).strip().isdigit()]
-        return sorted(set(ids))[:max_leagues]
+        ids = [int(x) for x in configured_ids if isinstance(x, (int, str)) and str(x).strip().isdigit()]
+        return tuple(sorted(set(ids))[:max_leagues])
 
     if mode == "from_core":
         sql = "select league_id from core.leagues order by league_id asc limit %(n)s"
         with pg_conn() as conn:
             with conn.cursor() as cur:
                 cur.execute(sql, {"n": max_leagues})
-                return [int(r[0]) for r in cur.fetchall()]
+                return tuple(int(r[0]) for r in cur.fetchall())
 
     if mode in {"approved", "from_approved_league_map"}:
-        return _load_approved_league_ids(max_leagues=max_leagues)
+        return tuple(_load_approved_league_ids(max_leagues=max_leagues))
 
     raise ValueError(
         "league_source.mode must be one of: ids, from_core, approved, from_approved_league_map"
@@ -263,6 +317,193 @@ def _resolve_endpoints(plan: Dict[str, Any], *, override: Optional[str] = None)
     return out
 
 
+@dataclass(frozen=True)
+class PlanUnit:
+    # tipado 1x na montagem do plano; o loop não recasta
+    league_id: int
+    season: int
+    ep_id: str
+    path: str
+    params_fmt: Callable[[int, int], Dict[str, Any]]
+
+
+_UNIT_COUNTERS = (
+    "raw_inserted", "raw_dedup", "core_upserts",
+    "calls_ok", "calls_fail", "pages_ok", "pages_fail", "units_skipped_done",
+)
+
+
+def _run_unit(
+    *,
+    client: ApiFootballClient,
+    provider: str,
+    unit: PlanUnit,
+    page_param: Optional[str],
+    max_pages_safety: int,
+    checkpoint_every: int,
+    async_commit: bool,
+    apply_core: bool,
+    resume: bool,
+    force: bool,
+    sleep_ms: int,
+    abort: Optional[threading.Event] = None,
+) -> Dict[str, int]:
+    """
+    Varre as páginas de uma unidade (league, season, endpoint) e devolve os
+    contadores dela. Roda numa thread do pool: conexão própria (do pool pg).
+    abort: setado quando outra unidade falhou; para antes da próxima chamada HTTP.
+    """
+    counters = dict.fromkeys(_UNIT_COUNTERS, 0)
+
+    league_id, season, ep_id, path = unit.league_id, unit.season, unit.ep_id, unit.path
+
+    # dict novo por unidade (fmt não compartilha); a página é gravada nele mesmo,
+    # sem cópia por página: request_params é serializado na hora (_raw_response_params)
+    params = unit.params_fmt(league_id, season)
+    page_key = str(page_param) if page_param else None
+
+    # RAW das páginas fica num buffer (já serializado) e vai ao banco junto com o
+    # checkpoint, a cada checkpoint_every páginas ou na transição (failed/done):
+    # 1 transação, 1 executemany. O checkpoint nunca passa à frente do RAW gravado;
+    # num crash, as páginas do buffer são buscadas de novo no resume.
+    raw_buffer: List[Dict[str, Any]] = []
+    core_buffer: List[Dict[str, Any]] = []  # payloads ok (só com apply_core)
+
+    def _flush(ck_last: int, ck_total: Optional[int], ck_status: str, ck_meta: Dict[str, Any]) -> None:
+        # CORE (opcional) + RAW + checkpoint: 1 transação, 1 commit. O CORE vem antes e
+        # fora do pipeline porque lotes grandes usam COPY (não suportado em pipeline).
+        with pg_tx(conn):
+            if async_commit or not raw_buffer:
+                _async_commit(conn)
+            for payload in core_buffer:
+                counters["core_upserts"] += _apply_core_from_payload(str(ep_id), payload, conn=conn)
+            with conn.pipeline():
+                results = _insert_raw_params_bulk(raw_buffer, conn=conn)
+                _upsert_checkpoint(
+                    provider,
+                    ep_id,
+                    league_id,
+                    season,
+                    last_page_done=ck_last,
+                    total_pages=ck_total,
+                    status=ck_status,
+                    meta=ck_meta,
+                    conn=conn,
+                )
+
+        for inserted, _ in results:
+            if inserted:
+                counters["raw_inserted"] += 1
+            else:
+                counters["raw_dedup"] += 1
+        raw_buffer.clear()
+        core_buffer.clear()
+
+    # Fora dos flushes a conexão fica ociosa (sem tx aberta).
+    with pg_conn() as conn:
+        # checkpoint (leitura fecha a tx para não segurar snapshot durante as chamadas HTTP)
+        with pg_tx(conn):
+            ck = _get_checkpoint(provider, ep_id, league_id, season, conn=conn)
+        if resume and not force and ck.get("status") == "done":
+            counters["units_skipped_done"] += 1
+            return counters
+
+        start_page = int(ck.get("last_page_done") or 0) + 1 if resume and not force else 1
+        seen_total_pages: Optional[int] = ck.get("total_pages")
+
+        page = start_page
+
+        while True:
+            if abort is not None and abort.is_set():
+                # outra unidade falhou: grava o que já foi buscado e para de gastar quota
+                # (checkpoint "running" na última página ok; o resume continua dali)
+                if raw_buffer:
+                    _flush(page - 1, seen_total_pages, "running", {"note": "aborted"})
+                break
+
+            if page > max_pages_safety:
+                _flush(page - 1, seen_total_pages, "failed", {"reason": "max_pages_safety_exceeded"})
+                counters["pages_fail"] += 1
+                break
+
+            if page_key:
+                params[page_key] = page
+
+            try:
+                status, payload = client.get(path, params)
+            except Exception as ex:
+                status, payload = 599, {"errors": {"exception": str(ex)}, "response": None}
+
+            ok_http = 200 <= int(status) < 300
+            api_errors = payload.get("errors") if isinstance(payload, dict) else None
+
+            # api-football costuma retornar [] quando ok; quando dá problema vem dict com campos
+            has_api_errors = isinstance(api_errors, dict) and len(api_errors) > 0
+
+            ok = bool(ok_http and not has_api_errors)
+
+            if not isinstance(payload, dict):
+                payload = {"errors": {"non_dict_payload": True}, "response": None}
+
+            # checkpoint final da página (1 escrita só; antes "running" e depois "done"
+            # eram gravados em sequência, o estado final é o mesmo)
+            if not ok:
+                ck_last, ck_total, ck_status = page - 1, seen_total_pages, "failed"
+                ck_meta: Dict[str, Any] = {"http_status": int(status), "errors": payload.get("errors")}
+            else:
+                paging_info = payload.get("paging") or {}
+                tot = paging_info.get("total")
+                if isinstance(tot, int):
+                    seen_total_pages = tot
+
+                if not isinstance(tot, int):
+                    # se não tem paginação, assume 1 página e encerra
+                    ck_last, ck_total, ck_status = page, 1, "done"
+                    ck_meta = {"note": "no_paging_in_payload"}
+                elif page >= tot:
+                    ck_last, ck_total, ck_status = page, tot, "done"
+                    ck_meta = {"note": "completed"}
+                else:
+                    ck_last, ck_total, ck_status = page, seen_total_pages, "running"
+                    ck_meta = {"last_ok_status": int(status)}
+
+            raw_buffer.append(
+                _raw_response_params(
+                    provider=provider,
+                    endpoint=str(ep_id),
+                    request_params={"path": path, "params": params, "league_id": league_id, "season": season},
+                    response_body=payload,
+                    http_status=int(status),
+                    ok=ok,
+                    error_message=None if ok else str(payload.get("errors")),
+                )
+            )
+            if apply_core and ok:
+                core_buffer.append(payload)
+
+            # "running" só a cada checkpoint_every páginas; transições (failed/done) sempre
+            if ck_status != "running" or len(raw_buffer) >= checkpoint_every:
+                _flush(ck_last, ck_total, ck_status, ck_meta)
+
+            if not ok:
+                counters["calls_fail"] += 1
+                counters["pages_fail"] += 1
+                break
+
+            counters["calls_ok"] += 1
+            counters["pages_ok"] += 1
+
+            if ck_status == "done":
+                break
+
+            if sleep_ms > 0:
+                time.sleep(float(sleep_ms) / 1000.0)
+
+            page += 1
+
+    return counters
+
+
 def run_backfill(
     *,
     dry_run: bool,
@@ -297,6 +538,12 @@ def run_backfill(
     paging = plan.get("paging") or {}
     page_param = paging.get("page_param")  # None => sem paginação por parâmetro
     max_pages_safety = int(paging.get("max_pages_safety", 50))
+    checkpoint_every = max(1, int(paging.get("checkpoint_every", 10)))
+    # commit assíncrono também nas páginas (opt-in): RAW + checkpoint estão na mesma tx,
+    # então um crash perde os dois juntos e o resume só refaz as chamadas (gasta quota).
+    async_commit = bool(paging.get("async_commit", False))
+    # aplicar no CORE junto com cada página (desligado por padrão; run_core_etl cobre via RAW)
+    apply_core = bool(plan.get("apply_core", False))
 
     counters = {
         "raw_inserted": 0,
@@ -311,254 +558,114 @@ def run_backfill(
     }
 
     # Monta todas as unidades antes para ter barra de progresso global (Units)
-    plan_units: List[Dict[str, Any]] = []
-    for league_id in league_ids:
-        for season in seasons:
-            for ep in endpoints:
-                plan_units.append(
-                    {
-                        "league_id": int(league_id),
-                        "season": int(season),
-                        "ep_id": str(ep["id"]),
-                        "path": str(ep["path"]),
-                        "params_template": ep.get("params") or {},
-                    }
-                )
+    # templates de params compilados 1x por endpoint (não por unidade)
+    params_fmts = [compile_params(ep.get("params") or {}) for ep in endpoints]
+    eps = [(str(ep["id"]), str(ep["path"]), fmt) for ep, fmt in zip(endpoints, params_fmts)]
+    plan_units: List[PlanUnit] = [
+        PlanUnit(league_id, season, ep_id, path, params_fmt)
+        for league_id in map(int, league_ids)
+        for season in map(int, seasons)
+        for ep_id, path, params_fmt in eps
+    ]
 
     total_units = len(plan_units)
 
-    units_bar = tqdm(plan_units, desc="Units", unit="unit", dynamic_ncols=True, total=total_units)
-
-    for unit in units_bar:
-        league_id = int(unit["league_id"])
-        season = int(unit["season"])
-        ep_id = str(unit["ep_id"])
-        path = str(unit["path"])
-        params_template = unit["params_template"]
-
-        base_params = _fmt_params(params_template, league_id=league_id, season=season)
-
-        if dry_run:
+    def _result(*, stopped_early: bool) -> Dict[str, Any]:
+        return {
+            "provider": provider,
+            "dry_run": bool(dry_run),
+            "calls_external_api": not bool(dry_run),
+            "mutates_database": not bool(dry_run),
+            "stopped_early": stopped_early,
+            "league_source": league_source or (plan.get("league_source") or {}).get("mode", "ids"),
+            "league_count": len(league_ids),
+            "season_count": len(seasons),
+            "endpoint_ids": [str(ep.get("id")) for ep in endpoints],
+            "league_ids": league_ids,
+            "seasons": seasons,
+            "counters": counters,
+            "units": total_units,
+        }
+
+    if dry_run:
+        for _unit in tqdm(plan_units, desc="Units", unit="unit", dynamic_ncols=True, mininterval=1.0):
             counters["units_planned"] += 1
             if stop_after is not None:
                 stop_after -= 1
                 if stop_after <= 0:
-                    return {
-                        "provider": provider,
-                        "dry_run": True,
-                        "calls_external_api": False,
-                        "mutates_database": False,
-                        "stopped_early": True,
-                        "league_source": league_source or (plan.get("league_source") or {}).get("mode", "ids"),
-                        "league_count": len(league_ids),
-                        "season_count": len(seasons),
-                        "endpoint_ids": [str(ep.get("id")) for ep in endpoints],
-                        "league_ids": league_ids,
-                        "seasons": seasons,
-                        "counters": counters,
-                        "units": total_units,
-                    }
-            continue
-
-        # checkpoint
-        ck = _get_checkpoint(provider, ep_id, league_id, season)
-        if resume and not force and ck.get("status") == "done":
-            counters["units_skipped_done"] += 1
-            continue
-
-        start_page = int(ck.get("last_page_done") or 0) + 1 if resume and not force else 1
-        seen_total_pages: Optional[int] = ck.get("total_pages")
-
-        # Atualiza descrição da unit atual
-        units_bar.set_postfix_str(f"{ep_id} L{league_id} S{season} p{start_page}")
-
-        page = start_page
-
-        # Barra de páginas (Pages) com total dinâmico (só fica conhecido após a 1ª resposta)
-        pages_bar = tqdm(
-            desc=f"Pages {ep_id} L{league_id} S{season}",
-            unit="page",
-            dynamic_ncols=True,
-            leave=False,
-            total=seen_total_pages if isinstance(seen_total_pages, int) else None,
-            initial=page - 1,
+                    return _result(stopped_early=True)
+        return _result(stopped_early=False)
+
+    assert client is not None
+
+    # Unidades são independentes: K em paralelo (HTTP de uma sobrepõe o DB de outra),
+    # cada uma com sua conexão do pool. --stop-after (debug) roda 1 por vez para
+    # parar exatamente na N-ésima unidade.
+    workers = max(1, int(settings.app_defaults.get("http_concurrency", 4)))
+    if stop_after is not None:
+        workers = 1
+
+    # 1 barra só (Units), redesenhada no máx. 1x/s; progresso de páginas vai no postfix
+    units_bar = tqdm(desc="Units", unit="unit", dynamic_ncols=True, total=total_units, mininterval=1.0)
+    units_iter = iter(plan_units)
+    units_done = 0
+
+    def _submit(ex: ThreadPoolExecutor, unit: PlanUnit) -> Future:
+        fut = ex.submit(
+            _run_unit,
+            client=client,
+            provider=provider,
+            unit=unit,
+            page_param=page_param,
+            max_pages_safety=max_pages_safety,
+            checkpoint_every=checkpoint_every,
+            async_commit=async_commit,
+            apply_core=apply_core,
+            resume=resume,
+            force=force,
+            sleep_ms=sleep_ms,
+            abort=abort,
         )
-
-        try:
-            while True:
-                if page > max_pages_safety:
-                    _upsert_checkpoint(
-                        provider,
-                        ep_id,
-                        league_id,
-                        season,
-                        last_page_done=page - 1,
-                        total_pages=seen_total_pages,
-                        status="failed",
-                        meta={"reason": "max_pages_safety_exceeded"},
-                    )
-                    counters["pages_fail"] += 1
-                    break
-
-                params = dict(base_params)
-                if page_param:
-                    params[str(page_param)] = page
-
-                if dry_run:
-                    status, payload = 200, {"response": [], "paging": {"current": page, "total": page}}
-                else:
+        futures[fut] = unit
+        return fut
+
+    futures: Dict[Future, PlanUnit] = {}
+    # 1ª falha de uma unidade: as demais em voo param na próxima página (a saída do
+    # with espera por elas), e as que ainda estão na fila nem chamam a API
+    abort = threading.Event()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            inflight = {_submit(ex, u) for u in islice(units_iter, workers)}
+            while inflight:
+                finished, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    unit = futures.pop(fut)
                     try:
-                        assert client is not None
-                        status, payload = client.get(path, params)
-                    except Exception as ex:
-                        status, payload = 599, {"errors": {"exception": str(ex)}, "response": None}
-
-                ok_http = 200 <= int(status) < 300
-                api_errors = payload.get("errors") if isinstance(payload, dict) else None
-
-                # api-football costuma retornar [] quando ok; quando dá problema vem dict com campos
-                has_api_errors = isinstance(api_errors, dict) and len(api_errors) > 0
-
-                ok = bool(ok_http and not has_api_errors)
-
-                if not isinstance(payload, dict):
-                    payload = {"errors": {"non_dict_payload": True}, "response": None}
-
-                # RAW ingest (idempotente)
-                inserted, _ = insert_raw_response(
-                    provider=provider,
-                    endpoint=str(ep_id),
-                    request_params={"path": path, "params": params, "league_id": league_id, "season": season},
-                    response_body=payload,
-                    http_status=int(status),
-                    ok=ok,
-                    error_message=None if ok else str(payload.get("errors")),
-                )
-                if inserted:
-                    counters["raw_inserted"] += 1
-                else:
-                    counters["raw_dedup"] += 1
-
-                if not ok:
-                    counters["calls_fail"] += 1
-                    counters["pages_fail"] += 1
-                    _upsert_checkpoint(
-                        provider,
-                        ep_id,
-                        league_id,
-                        season,
-                        last_page_done=page - 1,
-                        total_pages=seen_total_pages,
-                        status="failed",
-                        meta={"http_status": int(status), "errors": payload.get("errors")},
+                        unit_counters = fut.result()
+                    except BaseException:
+                        abort.set()
+                        raise
+                    for k, v in unit_counters.items():
+                        counters[k] += v
+                    if not unit_counters["units_skipped_done"]:
+                        units_done += 1
+                    units_bar.set_postfix_str(
+                        f"{unit.ep_id} L{unit.league_id} S{unit.season} "
+                        f"pages={counters['pages_ok']} raw={counters['raw_inserted']} "
+                        f"dedup={counters['raw_dedup']} fail={counters['pages_fail']}",
+                        refresh=False,
                     )
-                    # Mostra erro na barra
-                    pages_bar.set_postfix_str(f"FAIL {status}")
-                    break
-
-                counters["calls_ok"] += 1
-                counters["pages_ok"] += 1
-
-                # disabled
-                # counters["core_upserts"] += _apply_core_from_payload(str(ep_id), payload)
-
-                paging_info = payload.get("paging") or {}
-                tot = paging_info.get("total")
+                    units_bar.update(1)
 
-                if isinstance(tot, int):
-                    seen_total_pages = tot
-                    # Atualiza total do tqdm quando descoberto
-                    if pages_bar.total is None:
-                        pages_bar.total = tot
-
-                # checkpoint a cada página ok
-                _upsert_checkpoint(
-                    provider,
-                    ep_id,
-                    league_id,
-                    season,
-                    last_page_done=page,
-                    total_pages=seen_total_pages,
-                    status="running",
-                    meta={"last_ok_status": int(status)},
-                )
+                if stop_after is not None and units_done >= stop_after:
+                    return _result(stopped_early=True)
 
-                # Atualiza a barra
-                pages_bar.set_postfix_str(
-                    f"ok={counters['calls_ok']} raw={counters['raw_inserted']} dedup={counters['raw_dedup']}"
-                )
-                pages_bar.update(1)
+                inflight |= {_submit(ex, u) for u in islice(units_iter, len(finished))}
+    finally:
+        units_bar.close()
+        client.close()
 
-                # se não tem paginação, assume 1 página e encerra
-                if not isinstance(tot, int):
-                    _upsert_checkpoint(
-                        provider,
-                        ep_id,
-                        league_id,
-                        season,
-                        last_page_done=page,
-                        total_pages=1,
-                        status="done",
-                        meta={"note": "no_paging_in_payload"},
-                    )
-                    break
-
-                # terminou?
-                if page >= tot:
-                    _upsert_checkpoint(
-                        provider,
-                        ep_id,
-                        league_id,
-                        season,
-                        last_page_done=page,
-                        total_pages=tot,
-                        status="done",
-                        meta={"note": "completed"},
-                    )
-                    break
-
-                if sleep_ms > 0:
-                    time.sleep(float(sleep_ms) / 1000.0)
-
-                page += 1
-
-        finally:
-            pages_bar.close()
-
-        if stop_after is not None:
-            stop_after -= 1
-            if stop_after <= 0:
-                return {
-                    "provider": provider,
-                    "dry_run": bool(dry_run),
-                    "calls_external_api": not bool(dry_run),
-                    "mutates_database": not bool(dry_run),
-                    "stopped_early": True,
-                    "league_source": league_source or (plan.get("league_source") or {}).get("mode", "ids"),
-                    "league_count": len(league_ids),
-                    "season_count": len(seasons),
-                    "endpoint_ids": [str(ep.get("id")) for ep in endpoints],
-                    "league_ids": league_ids,
-                    "seasons": seasons,
-                    "counters": counters,
-                    "units": total_units,
-                }
-
-    return {
-        "provider": provider,
-        "dry_run": bool(dry_run),
-        "calls_external_api": not bool(dry_run),
-        "mutates_database": not bool(dry_run),
-        "stopped_early": False,
-        "league_source": league_source or (plan.get("league_source") or {}).get("mode", "ids"),
-        "league_count": len(league_ids),
-        "season_count": len(seasons),
-        "endpoint_ids": [str(ep.get("id")) for ep in endpoints],
-        "league_ids": league_ids,
-        "seasons": seasons,
-        "counters": counters,
-        "units": total_units,
-    }
+    return _result(stopped_early=False)
 
 
 def main() -> None:
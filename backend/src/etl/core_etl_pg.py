@@ -1,18 +1,24 @@
 from __future__ import annotations
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple
 
-from src.db.pg import pg_conn, pg_tx
+import psycopg
 
+from src.db.pg import PREPARE_HOT, pg_conn, pg_tx
 
-def _iter_response_items(raw_body: Any) -> Iterable[dict]:
+
+def _iter_response_items(raw_body: Any) -> Iterator[dict]:
     if not isinstance(raw_body, dict):
-        return []
+        return iter(())
     resp = raw_body.get("response")
     if isinstance(resp, list):
-        return [x for x in resp if isinstance(x, dict)]
-    return []
+        return (x for x in resp if isinstance(x, dict))
+    return iter(())
 
 
 def _parse_ts(value: Optional[str]) -> Optional[datetime]:
@@ -21,15 +27,21 @@ def _parse_ts(value: Optional[str]) -> Optional[datetime]:
     s = value.strip()
     if not s:
         return None
+
+    # fromisoformat (C) já é o caminho rápido: no 3.11 aceita "Z" e "±HH:MM" direto,
+    # e ganha com folga de fatiar a string e montar o datetime em Python.
     try:
-        if s.endswith("Z"):
-            s = s[:-1] + "+00:00"
         dt = datetime.fromisoformat(s)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
-    except Exception:
-        return None
+    except ValueError:
+        if not s.endswith("Z"):
+            return None
+        try:
+            dt = datetime.fromisoformat(s[:-1] + "+00:00")
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
 
 
 LEAGUES_UPSERT_SQL = """
@@ -117,9 +129,81 @@ on conflict (fixture_id) do update set
 """
 
 
+# ----------------------------
+# COPY staging (lotes grandes)
+# ----------------------------
+
+# A partir deste tamanho, apply_upserts faz COPY para uma temp table e um único
+# INSERT ... SELECT ... ON CONFLICT, em vez de executemany (páginas de fixtures
+# do backfill já passam disso).
+COPY_MIN_ROWS = int(os.getenv("CORE_ETL_COPY_MIN_ROWS", "200"))
+
+# Acima de SHARD_MIN_ROWS, o upsert é dividido em UPSERT_SHARDS conexões paralelas.
+UPSERT_SHARDS = int(os.getenv("CORE_ETL_UPSERT_SHARDS", "4"))
+SHARD_MIN_ROWS = 5000
+
+LEAGUES_COLUMNS = (
+    "league_id", "name", "type", "country_name", "country_code",
+    "logo_url", "flag_url", "is_active",
+)
+
+TEAMS_COLUMNS = (
+    "team_id", "name", "code", "country_name", "founded_year", "is_national", "logo_url",
+    "venue_id", "venue_name", "venue_city", "venue_capacity",
+)
+
+FIXTURES_COLUMNS = (
+    "fixture_id", "league_id", "season", "round",
+    "kickoff_utc", "timezone", "venue_name", "venue_city",
+    "home_team_id", "away_team_id",
+    "status_long", "status_short", "elapsed_min",
+    "goals_home", "goals_away",
+    "is_finished", "is_cancelled",
+)
+
+# upsert_sql -> (tabela, pk, colunas)
+_COPY_SPECS: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    LEAGUES_UPSERT_SQL: ("core.leagues", "league_id", LEAGUES_COLUMNS),
+    TEAMS_UPSERT_SQL: ("core.teams", "team_id", TEAMS_COLUMNS),
+    FIXTURES_UPSERT_SQL: ("core.fixtures", "fixture_id", FIXTURES_COLUMNS),
+}
+
+
+def _copy_upserts(cur: Any, table: str, pk: str, columns: Tuple[str, ...], rows: List[dict]) -> None:
+    stage = "stg_" + table.replace(".", "_")
+    cols = ", ".join(columns)
+    updates = ",\n  ".join(f"{c} = excluded.{c}" for c in columns if c != pk)
+
+    cur.execute(f"create temp table {stage} (like {table} including defaults) on commit drop")
+
+    with cur.copy(f"copy {stage} ({cols}) from stdin") as cp:
+        for r in rows:
+            cp.write_row(tuple(r[c] for c in columns))
+
+    cur.execute(
+        f"""
+insert into {table} ({cols}, updated_at_utc)
+select {cols}, now() from {stage}
+on conflict ({pk}) do update set
+  {updates},
+  updated_at_utc = now();
+"""
+    )
+    # drop explícito: a mesma transação pode fazer outro COPY (conexão compartilhada)
+    cur.execute(f"drop table {stage}")
+
+
+_FINISHED_STATUSES = frozenset({"FT", "AET", "PEN"})
+_CANCELLED_STATUSES = frozenset({"CANC", "PST"})
+
+
+# "x.get(k) or _EMPTY": um só dict vazio (read-only) em vez de um {} novo por acesso
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
 def map_league(item: dict) -> Optional[dict]:
-    league = item.get("league") or {}
-    country = item.get("country") or {}
+    league = item.get("league") or _EMPTY
+    country = item.get("country") or _EMPTY
 
     league_id = league.get("id")
     name = league.get("name")
@@ -139,8 +223,8 @@ def map_league(item: dict) -> Optional[dict]:
 
 
 def map_team(item: dict) -> Optional[dict]:
-    team = item.get("team") or {}
-    venue = item.get("venue") or {}
+    team = item.get("team") or _EMPTY
+    venue = item.get("venue") or _EMPTY
 
     team_id = team.get("id")
     name = team.get("name")
@@ -163,28 +247,31 @@ def map_team(item: dict) -> Optional[dict]:
 
 
 def map_fixture(item: dict) -> Optional[dict]:
-    fixture = item.get("fixture") or {}
-    league = item.get("league") or {}
-    teams = item.get("teams") or {}
-    goals = item.get("goals") or {}
-    status = (fixture.get("status") or {})
+    fixture = item.get("fixture") or _EMPTY
+    league = item.get("league") or _EMPTY
+    teams = item.get("teams") or _EMPTY
+    goals = item.get("goals") or _EMPTY
+    status = fixture.get("status") or _EMPTY
 
     fixture_id = fixture.get("id")
     league_id = league.get("id")
     season = league.get("season")
-    home_id = (teams.get("home") or {}).get("id")
-    away_id = (teams.get("away") or {}).get("id")
+    home_id = (teams.get("home") or _EMPTY).get("id")
+    away_id = (teams.get("away") or _EMPTY).get("id")
 
-    kickoff_dt = _parse_ts(fixture.get("date"))
+    if None in (fixture_id, league_id, season, home_id, away_id):
+        return None
 
-    if None in (fixture_id, league_id, season, home_id, away_id) or kickoff_dt is None:
+    # parse só depois dos ids (item incompleto não paga o parse)
+    kickoff_dt = _parse_ts(fixture.get("date"))
+    if kickoff_dt is None:
         return None
 
     status_short = status.get("short")
-    is_finished = status_short in ("FT", "AET", "PEN")
-    is_cancelled = status_short in ("CANC", "PST")
+    is_finished = status_short in _FINISHED_STATUSES
+    is_cancelled = status_short in _CANCELLED_STATUSES
 
-    venue = fixture.get("venue") or {}
+    venue = fixture.get("venue") or _EMPTY
 
     return {
         "fixture_id": int(fixture_id),
@@ -202,19 +289,25 @@ def map_fixture(item: dict) -> Optional[dict]:
         "elapsed_min": status.get("elapsed"),
         "goals_home": goals.get("home"),
         "goals_away": goals.get("away"),
-        "is_finished": bool(is_finished),
-        "is_cancelled": bool(is_cancelled),
+        "is_finished": is_finished,
+        "is_cancelled": is_cancelled,
     }
 
 
-def _load_raw_bodies(
+# Linhas por FETCH do cursor server-side (cada response_body pode ter dezenas de KB).
+RAW_STREAM_ITERSIZE = 1000
+
+
+def _iter_raw_bodies(
     *,
     provider: str,
     endpoint: str,
-    limit: int,
+    limit: Optional[int],
     league_ids: Optional[List[int]] = None,
     seasons: Optional[List[int]] = None,
-) -> List[dict]:
+    after_id: Optional[int] = None,
+    conn: Optional[psycopg.Connection] = None,
+) -> Iterator[Tuple[int, dict]]:
     where = [
         "provider = %(provider)s",
         "endpoint = %(endpoint)s",
@@ -224,9 +317,12 @@ def _load_raw_bodies(
     params: Dict[str, Any] = {
         "provider": provider,
         "endpoint": endpoint,
-        "limit": int(limit),
     }
 
+    if after_id is not None:
+        params["after_id"] = int(after_id)
+        where.append("id > %(after_id)s")
+
     if seasons:
         params["seasons"] = [str(int(x)) for x in seasons]
         where.append("(request_params->'params'->>'season') = ANY(%(seasons)s)")
@@ -235,50 +331,119 @@ def _load_raw_bodies(
         params["league_ids"] = [str(int(x)) for x in league_ids]
         where.append("(request_params->'params'->>'league') = ANY(%(league_ids)s)")
 
+    limit_sql = ""
+    if limit is not None:
+        params["limit"] = int(limit)
+        limit_sql = "limit %(limit)s"
+
     sql = f"""
-    select response_body
+    select id, response_body
     from raw.api_responses
     where {' and '.join(where)}
     order by fetched_at_utc desc
-    limit %(limit)s
+    {limit_sql}
     """
 
-    with pg_conn() as conn:
-        with conn.cursor() as cur:
+    # Cursor nomeado (server-side): os bodies chegam em lotes de itersize,
+    # sem materializar o resultado inteiro em memória.
+    with (nullcontext(conn) if conn is not None else pg_conn()) as c:
+        with c.cursor(name="core_etl_raw_stream") as cur:
+            cur.itersize = RAW_STREAM_ITERSIZE
             cur.execute(sql, params)
-            return [r[0] for r in cur.fetchall()]
+            yield from cur
+
+
+# Watermark do ETL incremental (migrations/2026-10-16_core_etl_watermark_v1.sql).
+# O escopo entra na chave: um run filtrado por ligas/seasons não pode avançar a
+# marca de RAW que ele nem olhou.
+# Ids do RAW não ficam visíveis em ordem (workers do backfill inserem em paralelo):
+# um id menor pode commitar depois de a marca já ter passado dele. Cada run relê
+# os últimos WATERMARK_MARGIN ids abaixo da marca (upserts são idempotentes);
+# RAW que commitar mais atrasado que isso só entra num run sem --incremental.
+WATERMARK_MARGIN = max(0, int(os.getenv("CORE_ETL_WATERMARK_MARGIN", "5000")))
+
+WATERMARK_GET_SQL = """
+select last_raw_id from core.etl_watermark
+where provider = %s and endpoint = %s and scope = %s
+for update
+"""
 
-def _apply_upserts(upsert_sql: str, rows: List[dict]) -> int:
-    if not rows:
-        return 0
+WATERMARK_SET_SQL = """
+insert into core.etl_watermark (provider, endpoint, scope, last_raw_id, updated_at_utc)
+values (%s, %s, %s, %s, now())
+on conflict (provider, endpoint, scope) do update set
+  last_raw_id = greatest(core.etl_watermark.last_raw_id, excluded.last_raw_id),
+  updated_at_utc = now()
+"""
+
+
+def _watermark_scope(league_ids: Optional[List[int]], seasons: Optional[List[int]]) -> str:
+    leagues = ",".join(str(x) for x in sorted({int(x) for x in league_ids or ()}))
+    ssns = ",".join(str(x) for x in sorted({int(x) for x in seasons or ()}))
+    return f"leagues={leagues};seasons={ssns}"
+
+
+def _apply_upserts_cur(cur: Any, upsert_sql: str, rows: List[dict]) -> None:
+    # sem commit: quem chama controla a transação
+    spec = _COPY_SPECS.get(upsert_sql)
+    if spec is not None and len(rows) >= COPY_MIN_ROWS:
+        table, pk, columns = spec
+        # ON CONFLICT não aceita a mesma pk duas vezes no mesmo INSERT;
+        # a última ocorrência vence, como no executemany.
+        by_pk = {r[pk]: r for r in rows}
+        _copy_upserts(cur, table, pk, columns, list(by_pk.values()))
+    else:
+        # executemany no psycopg3 envia os binds em pipeline (1 round-trip
+        # por lote), em vez de 1 execute por linha. Upsert é sempre quente:
+        # prepara já na 1ª linha (threshold 0 só durante o lote; a conexão é do pool).
+        conn = cur.connection
+        prev = conn.prepare_threshold
+        if PREPARE_HOT and prev != 0:
+            conn.prepare_threshold = 0
+        try:
+            cur.executemany(upsert_sql, rows)
+        finally:
+            conn.prepare_threshold = prev
+
+
+def _apply_upserts_tx(upsert_sql: str, rows: List[dict]) -> None:
     with pg_conn() as conn:
         with pg_tx(conn):
             with conn.cursor() as cur:
-                n = 0
-                for r in rows:
-                    cur.execute(upsert_sql, r)
-                    n += 1
-                return n
+                _apply_upserts_cur(cur, upsert_sql, rows)
 
-def _dedupe_rows_keep_first(rows: List[dict], key_field: str) -> List[dict]:
-    seen = set()
-    out: List[dict] = []
 
-    for row in rows:
-        if not row:
-            continue
+def apply_upserts(upsert_sql: str, rows: List[dict]) -> int:
+    if not rows:
+        return 0
+
+    spec = _COPY_SPECS.get(upsert_sql)
+    if spec is None or UPSERT_SHARDS <= 1 or len(rows) < SHARD_MIN_ROWS:
+        _apply_upserts_tx(upsert_sql, rows)
+        return len(rows)
 
-        key = row.get(key_field)
-        if key is None:
-            continue
+    # Lotes grandes: particiona por pk % N (shards disjuntos, sem conflito de linha
+    # entre conexões) e grava cada shard numa conexão do pool em paralelo.
+    # Cada shard commita sozinho; um rerun é idempotente via ON CONFLICT.
+    pk = spec[1]
+    shards: List[List[dict]] = [[] for _ in range(UPSERT_SHARDS)]
+    for r in rows:
+        shards[int(r[pk]) % UPSERT_SHARDS].append(r)
 
-        if key in seen:
-            continue
+    with ThreadPoolExecutor(max_workers=UPSERT_SHARDS) as ex:
+        futures = [ex.submit(_apply_upserts_tx, upsert_sql, shard) for shard in shards if shard]
+        for f in futures:
+            f.result()
 
-        seen.add(key)
-        out.append(row)
+    return len(rows)
+
+# endpoint -> (mapper, upsert_sql, chave de dedupe, filtra league_ids, filtra seasons)
+_ETL_SPECS: Dict[str, Tuple[Callable[[dict], Optional[dict]], str, str, bool, bool]] = {
+    "leagues": (map_league, LEAGUES_UPSERT_SQL, "league_id", True, False),
+    "teams": (map_team, TEAMS_UPSERT_SQL, "team_id", False, False),
+    "fixtures": (map_fixture, FIXTURES_UPSERT_SQL, "fixture_id", True, True),
+}
 
-    return out
 
 def run_core_etl(
     *,
@@ -288,60 +453,93 @@ def run_core_etl(
     league_ids: Optional[List[int]] = None,
     seasons: Optional[List[int]] = None,
     dry_run: bool = False,
+    incremental: bool = False,
+    conn: Optional[psycopg.Connection] = None,
 ) -> Dict[str, int]:
-    bodies = _load_raw_bodies(
+    """
+    conn: conexão do chamador (sem commit aqui); leitura do RAW e upserts rodam nela,
+    na transação de quem chama. Sem conn: pool, 1 transação própria (ou shards).
+    incremental: só o RAW com id acima do watermark de (provider, endpoint, escopo)
+    menos WATERMARK_MARGIN, sem `limit`; a marca avança na mesma transação dos upserts.
+    """
+    spec = _ETL_SPECS.get(endpoint)
+    if spec is None:
+        raise ValueError("endpoint must be one of: leagues|teams|fixtures")
+    mapper, upsert_sql, key_field, filter_leagues, filter_seasons = spec
+
+    if incremental and conn is None:
+        with pg_conn() as conn:
+            with pg_tx(conn):
+                return run_core_etl(
+                    provider=provider,
+                    endpoint=endpoint,
+                    limit=limit,
+                    league_ids=league_ids,
+                    seasons=seasons,
+                    dry_run=dry_run,
+                    incremental=True,
+                    conn=conn,
+                )
+
+    after_id: Optional[int] = None
+    last_raw_id = 0
+    if incremental:
+        scope = _watermark_scope(league_ids, seasons)
+        with conn.cursor() as cur:
+            cur.execute(WATERMARK_GET_SQL, (provider, endpoint, scope))
+            row = cur.fetchone()
+        last_raw_id = int(row[0]) if row else 0
+        # margem abaixo da marca: pega ids menores que commitaram depois do último run
+        after_id = max(0, last_raw_id - WATERMARK_MARGIN)
+
+    bodies = _iter_raw_bodies(
         provider=provider,
         endpoint=endpoint,
-        limit=limit,
+        limit=None if incremental else limit,
         league_ids=league_ids,
         seasons=seasons,
+        after_id=after_id,
+        conn=conn,
     )
-
-    if endpoint == "leagues":
-        mapped = [map_league(it) for b in bodies for it in _iter_response_items(b)]
-        mapped = [m for m in mapped if m is not None]
-
-        if league_ids:
-            allow = set(int(x) for x in league_ids)
-            mapped = [m for m in mapped if int(m["league_id"]) in allow]
-
-        mapped = _dedupe_rows_keep_first(mapped, "league_id")
-
-        if dry_run:
-            return {"raw_rows": len(bodies), "items": len(mapped), "upserts": 0}
-
-        upserts = _apply_upserts(LEAGUES_UPSERT_SQL, mapped)
-        return {"raw_rows": len(bodies), "items": len(mapped), "upserts": upserts}
-
-    if endpoint == "teams":
-        mapped = [map_team(it) for b in bodies for it in _iter_response_items(b)]
-        mapped = [m for m in mapped if m is not None]
-        mapped = _dedupe_rows_keep_first(mapped, "team_id")
-
-        if dry_run:
-            return {"raw_rows": len(bodies), "items": len(mapped), "upserts": 0}
-
-        upserts = _apply_upserts(TEAMS_UPSERT_SQL, mapped)
-        return {"raw_rows": len(bodies), "items": len(mapped), "upserts": upserts}
-
-    if endpoint == "fixtures":
-        mapped = [map_fixture(it) for b in bodies for it in _iter_response_items(b)]
-        mapped = [m for m in mapped if m is not None]
-
-        if league_ids:
-            allow_leagues = set(int(x) for x in league_ids)
-            mapped = [m for m in mapped if int(m["league_id"]) in allow_leagues]
-
-        if seasons:
-            allow_seasons = set(int(x) for x in seasons)
-            mapped = [m for m in mapped if int(m["season"]) in allow_seasons]
-
-        mapped = _dedupe_rows_keep_first(mapped, "fixture_id")
-
-        if dry_run:
-            return {"raw_rows": len(bodies), "items": len(mapped), "upserts": 0}
-
-        upserts = _apply_upserts(FIXTURES_UPSERT_SQL, mapped)
-        return {"raw_rows": len(bodies), "items": len(mapped), "upserts": upserts}
-
-    raise ValueError("endpoint must be one of: leagues|teams|fixtures")
+    raw_rows = 0
+    max_raw_id = after_id or 0
+
+    allow_leagues = set(int(x) for x in league_ids) if (filter_leagues and league_ids) else None
+    allow_seasons = set(int(x) for x in seasons) if (filter_seasons and seasons) else None
+
+    # bodies chegam em stream (mais recentes primeiro); map + filtro + dedupe
+    # (primeira ocorrência vence) numa passada, sem lista intermediária
+    seen: Set[Any] = set()
+    mapped: List[dict] = []
+    for raw_id, b in bodies:
+        raw_rows += 1
+        if raw_id > max_raw_id:
+            max_raw_id = raw_id
+        for it in _iter_response_items(b):
+            m = mapper(it)
+            if m is None:
+                continue
+            if allow_leagues is not None and int(m["league_id"]) not in allow_leagues:
+                continue
+            if allow_seasons is not None and int(m["season"]) not in allow_seasons:
+                continue
+            key = m.get(key_field)
+            if key is None or key in seen:
+                continue
+            seen.add(key)
+            mapped.append(m)
+
+    if dry_run:
+        return {"raw_rows": raw_rows, "items": len(mapped), "upserts": 0}
+
+    if conn is not None:
+        if mapped:
+            with conn.cursor() as cur:
+                _apply_upserts_cur(cur, upsert_sql, mapped)
+        if incremental and max_raw_id > last_raw_id:
+            with conn.cursor() as cur:
+                cur.execute(WATERMARK_SET_SQL, (provider, endpoint, scope, max_raw_id))
+        upserts = len(mapped)
+    else:
+        upserts = apply_upserts(upsert_sql, mapped)
+    return {"raw_rows": raw_rows, "items": len(mapped), "upserts": upserts}
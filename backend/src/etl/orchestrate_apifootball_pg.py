@@ -2,28 +2,53 @@ from __future__ import annotations
 
 import argparse
 import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import takewhile
 from typing import Any, Dict, List, Tuple
 
 from src.core.settings import load_settings
+from src.db.pg import pg_conn, pg_tx
 from src.provider.apifootball.client import ApiFootballClient
 
-from src.etl.raw_ingest_pg import insert_raw_response
+from src.etl.raw_ingest_pg import insert_raw_responses_bulk, load_recent_raw_hashes
 from src.etl.core_etl_pg import run_core_etl
 
 
 def _call(client: ApiFootballClient, path: str, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
-    status, payload = client.get(path, params)
+    # timeout/erro de rede/JSON vira linha RAW com falha (como no backfill), sem derrubar o run
+    try:
+        status, payload = client.get(path, params)
+    except Exception as ex:
+        return 599, {"errors": {"exception": str(ex)}, "response": None}
     if not isinstance(payload, dict):
         payload = {"errors": {"non_dict_payload": True}, "response": None}
     return int(status), payload
 
 
+# separa por vírgula ou espaço, mas não no espaço em volta do "-" de uma faixa ("2021 - 2024")
+_LIST_SEP_RE = re.compile(r"\s*,\s*|(?<![\s-])\s+(?![\s-])")
+_INT_RANGE_RE = re.compile(r"(\d+)(?:\s*-\s*(\d+))?")
+
+
 def _parse_int_list(csv: str) -> List[int]:
+    """
+    "39,140" / "39 140" -> [39, 140]; aceita faixas ("2021-2024", "2021 - 2024").
+    Parte inválida ("2021-", "x") levanta ValueError em vez de sumir em silêncio.
+    """
     out: List[int] = []
-    for part in (csv or "").split(","):
-        p = part.strip()
-        if p.isdigit():
-            out.append(int(p))
+    for part in _LIST_SEP_RE.split((csv or "").strip()):
+        if not part:
+            continue
+        m = _INT_RANGE_RE.fullmatch(part)
+        if m is None:
+            raise ValueError(f"invalid int list item: {part!r}")
+        lo = int(m.group(1))
+        hi = int(m.group(2)) if m.group(2) is not None else lo
+        if hi < lo:
+            raise ValueError(f"invalid range: {part!r}")
+        out.extend(range(lo, hi + 1))
     return out
 
 
@@ -37,17 +62,9 @@ def _parse_seasons(seasons_arg: str) -> List[int]:
     s = (seasons_arg or "").strip()
     if not s:
         raise ValueError("--seasons is required")
-
-    if "-" in s and "," not in s:
-        a, b = s.split("-", 1)
-        a = int(a.strip())
-        b = int(b.strip())
-        if b < a:
-            raise ValueError("season range invalid")
-        return list(range(a, b + 1))
-
     items = _parse_int_list(s)
     if not items:
+        # só separadores (",", " , "): sem isso o run não chamaria a API e ainda rodaria o CORE
         raise ValueError("invalid seasons format")
     return items
 
@@ -59,12 +76,16 @@ def orchestrate_apifootball_pg(
     seasons: List[int],
     max_calls: int = 30,
     dry_run: bool = False,
+    known_hours: int = 0,
+    incremental: bool = False,
 ) -> Dict[str, Any]:
     s = load_settings()
     client = ApiFootballClient(
         base_url=s.apifootball_base_url,
         api_key=s.apifootball_key,
         timeout_s=int(s.app_defaults.get("http_timeout_s", 30)),
+        connect_timeout_s=float(s.app_defaults.get("http_connect_timeout_s", 5)),
+        connect_retries=int(s.app_defaults.get("http_connect_retries", 2)),
     )
 
     calls_left = int(max_calls)
@@ -76,10 +97,20 @@ def orchestrate_apifootball_pg(
         "calls": {"ok": 0, "fail": 0},
     }
 
+    raw_buffer: List[Dict[str, Any]] = []
+    # teams/fixtures de ligas diferentes rodam em paralelo (I/O bound);
+    # o lock protege orçamento de calls, buffer e contadores.
+    concurrency = max(1, int(s.app_defaults.get("http_concurrency", 4)))
+    lock = threading.Lock()
+    # setado quando algo escapa do fan-out: os workers restantes param de gastar orçamento
+    aborted = threading.Event()
+
     def ingest(endpoint: str, path: str, params: Dict[str, Any]) -> bool:
         nonlocal calls_left
-        if calls_left <= 0:
-            return False
+        with lock:
+            if aborted.is_set() or calls_left <= 0:
+                return False
+            calls_left -= 1
 
         if dry_run:
             status, payload = 200, {"response": [], "paging": {"current": 1, "total": 1}}
@@ -87,68 +118,96 @@ def orchestrate_apifootball_pg(
             status, payload = _call(client, path, params)
 
         ok = 200 <= status < 300
-        inserted, _ = insert_raw_response(
-            provider=provider,
-            endpoint=endpoint,
-            request_params={"path": path, "params": params},
-            response_body=payload,
-            http_status=status,
-            ok=ok,
-            error_message=None if ok else str(payload.get("errors")),
-        )
-
-        calls_left -= 1
-        if ok:
-            report["calls"]["ok"] += 1
-        else:
-            report["calls"]["fail"] += 1
-
-        if inserted:
-            report["raw"][endpoint] += 1
-        else:
-            report["raw"]["dedup"] += 1
+        with lock:
+            # RAW vai para o buffer; gravamos tudo de uma vez antes do CORE.
+            raw_buffer.append(
+                {
+                    "provider": provider,
+                    "endpoint": endpoint,
+                    "request_params": {"path": path, "params": params},
+                    "response_body": payload,
+                    "http_status": status,
+                    "ok": ok,
+                    "error_message": None if ok else str(payload.get("errors")),
+                }
+            )
+
+            if ok:
+                report["calls"]["ok"] += 1
+            else:
+                report["calls"]["fail"] += 1
 
         return ok
 
-    for season in seasons:
-        if not ingest("leagues", "/leagues", {"season": season}):
-            break
-
-        for league_id in league_ids:
-            if calls_left <= 0:
-                break
-
-            if not ingest("teams", "/teams", {"league": league_id, "season": season}):
-                continue
-
-            if calls_left <= 0:
-                break
-
-            ingest("fixtures", "/fixtures", {"league": league_id, "season": season})
-
-    report["core"]["leagues"] = run_core_etl(
-        provider=provider,
-        endpoint="leagues",
-        limit=500,
-        league_ids=league_ids,
-        seasons=seasons,
-    )
-
-    report["core"]["teams"] = run_core_etl(
-        provider=provider,
-        endpoint="teams",
-        limit=500,
-        league_ids=league_ids,
-        seasons=seasons,
-    )
-
-    report["core"]["fixtures"] = run_core_etl(
-        provider=provider,
-        endpoint="fixtures",
-        limit=1000,
-        league_ids=league_ids,
-        seasons=seasons,
-    )
+    def ingest_league(league_id: int, season: int) -> None:
+        if not ingest("teams", "/teams", {"league": league_id, "season": season}):
+            return
+        ingest("fixtures", "/fixtures", {"league": league_id, "season": season})
+
+    def write_raw(conn: Any) -> None:
+        # known_hours > 0: dedup pelo set de hashes recentes (re-runs idempotentes)
+        known = load_recent_raw_hashes(provider, hours=known_hours, conn=conn) if known_hours > 0 else None
+        results = insert_raw_responses_bulk(raw_buffer, conn=conn, known=known)
+        for r, (inserted, _) in zip(raw_buffer, results):
+            if inserted:
+                report["raw"][r["endpoint"]] += 1
+            else:
+                report["raw"]["dedup"] += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            try:
+                planned_calls = len(seasons) * (1 + 2 * len(league_ids))
+                if calls_left >= planned_calls:
+                    # orçamento cobre o plano inteiro: a ordem de consumo não importa, então
+                    # todas as seasons entram juntas no pool (sem barreira entre seasons).
+                    # Seasons depois da 1ª falha em /leagues continuam fora, como no modo serial.
+                    leagues_ok = list(pool.map(lambda season: ingest("leagues", "/leagues", {"season": season}), seasons))
+                    run_seasons = list(takewhile(lambda sv: sv[1], zip(seasons, leagues_ok)))
+                    futures = [
+                        pool.submit(ingest_league, league_id, season)
+                        for season, _ in run_seasons
+                        for league_id in league_ids
+                    ]
+                    for f in futures:
+                        f.result()
+                else:
+                    for season in seasons:
+                        if not ingest("leagues", "/leagues", {"season": season}):
+                            break
+
+                        # a season inteira termina antes da próxima (mesma ordem de consumo do orçamento)
+                        futures = [pool.submit(ingest_league, league_id, season) for league_id in league_ids]
+                        for f in futures:
+                            f.result()
+            except BaseException:
+                aborted.set()
+                raise
+    except BaseException:
+        # o que já foi buscado (quota gasta) vai para o RAW mesmo assim; CORE só no sucesso
+        if raw_buffer:
+            with pg_conn() as conn:
+                with pg_tx(conn):
+                    write_raw(conn)
+        raise
+    finally:
+        client.close()
+
+    # RAW + CORE (3 endpoints) numa conexão e numa transação só: 1 commit no fim
+    with pg_conn() as conn:
+        with pg_tx(conn):
+            write_raw(conn)
+
+            for endpoint, limit in (("leagues", 500), ("teams", 500), ("fixtures", 1000)):
+                report["core"][endpoint] = run_core_etl(
+                    provider=provider,
+                    endpoint=endpoint,
+                    limit=limit,
+                    league_ids=league_ids,
+                    seasons=seasons,
+                    incremental=incremental,
+                    conn=conn,
+                )
 
     report["plan"]["calls_left"] = calls_left
     return report
@@ -161,6 +220,8 @@ def main() -> None:
     ap.add_argument("--seasons", required=True, help='ex: "2021-2024" or "2022,2023,2024"')
     ap.add_argument("--max-calls", type=int, default=30, help="hard cap of API calls for safety")
     ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--incremental", action="store_true", help="CORE only from RAW newer than the ETL watermark (re-reads CORE_ETL_WATERMARK_MARGIN ids below it; RAW committed later than that needs a full run)")
+    ap.add_argument("--known-hours", type=int, default=0, help="skip RAW already stored in the last N hours (0 = off)")
     args = ap.parse_args()
 
     report = orchestrate_apifootball_pg(
@@ -169,6 +230,8 @@ def main() -> None:
         seasons=_parse_seasons(args.seasons),
         max_calls=args.max_calls,
         dry_run=args.dry_run,
+        known_hours=args.known_hours,
+        incremental=args.incremental,
     )
 
     print(json.dumps(report, ensure_ascii=False, indent=2))
@@ -2,26 +2,96 @@ from __future__ import annotations
 
 import hashlib
 import json
-from typing import Any, Dict, Optional, Tuple
+import os
+from typing import AbstractSet, Any, Dict, FrozenSet, List, Optional, Set, Tuple
 
-from psycopg.types.json import Json
+import psycopg
+from psycopg import pq
+from psycopg.types.json import Jsonb
 
 from src.db.pg import pg_conn, pg_tx
 
+try:
+    import blake3  # opcional (RAW_HASH_ALGO=blake3)
+except ImportError:  # pragma: no cover
+    blake3 = None
+
+try:
+    import orjson  # opcional (RAW_CANONICAL_JSON=orjson)
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# sha256 (padrão) mantém os response_hash já gravados; trocar para blake2b/blake3 faz
+# cada payload antigo ser gravado 1x de novo (dedup é por provider+endpoint+hash).
+# blake2b (stdlib, 32 bytes -> mesmos 64 hex) é mais rápido que sha256 sem SHA-NI.
+RAW_HASH_ALGO = (os.getenv("RAW_HASH_ALGO") or "sha256").strip().lower()
+
+# json (padrão) = json.dumps canônico, os bytes que geraram os response_hash já gravados.
+# orjson é bem mais rápido, mas escreve floats diferente (1e-05 -> 0.00001, 1e+16 -> 1e16,
+# NaN -> null): payload com esses valores ganha outro hash e o dedup contra o RAW
+# existente para de casar. Mesmo trade-off do RAW_HASH_ALGO.
+RAW_CANONICAL_JSON = (os.getenv("RAW_CANONICAL_JSON") or "json").strip().lower()
+
 
 def _canonical_json(obj: Any) -> str:
     return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
 
 
-def _sha256_hex(s: str) -> str:
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+def _canonical_bytes(obj: Any) -> bytes:
+    if RAW_CANONICAL_JSON == "orjson":
+        if orjson is None:
+            raise RuntimeError("RAW_CANONICAL_JSON=orjson requires the 'orjson' package")
+        # inteiros > 64 bits caem no stdlib
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return _canonical_json(obj).encode("utf-8")
+
+
+def _digest_hex(b: bytes) -> str:
+    if RAW_HASH_ALGO == "blake3":
+        if blake3 is None:
+            raise RuntimeError("RAW_HASH_ALGO=blake3 requires the 'blake3' package")
+        return blake3.blake3(b).hexdigest()
+    if RAW_HASH_ALGO == "blake2b":
+        return hashlib.blake2b(b, digest_size=32).hexdigest()
+    return hashlib.sha256(b).hexdigest()
 
 
 def compute_response_hash(payload: Any) -> str:
-    return _sha256_hex(_canonical_json(payload))
+    return _digest_hex(_canonical_bytes(payload))
 
 
-def insert_raw_response(
+def _passthrough(b: bytes) -> bytes:
+    return b
+
+
+def _prejson(data: bytes) -> Jsonb:
+    # bytes já serializados: o dumper do psycopg só repassa (sem json.dumps de novo).
+    # Jsonb (não Json): o parâmetro já chega como jsonb, sem parse json + cast json->jsonb no server.
+    return Jsonb(data, dumps=_passthrough)
+
+
+# response_hash fica no cliente (não coluna generated): os bytes já são serializados
+# para o jsonb de qualquer forma, o hash é do JSON canônico (jsonb::text tem outra
+# ordenação de chaves, quebraria o dedup das linhas existentes) e um ADD COLUMN
+# ... STORED reescreveria raw.api_responses inteira. 1 round-trip: on conflict + returning.
+RAW_RESPONSE_INSERT_SQL = """
+insert into raw.api_responses (
+  provider, endpoint, request_params, response_body,
+  response_hash, http_status, ok, error_message
+)
+values (
+  %(provider)s, %(endpoint)s, %(request_params)s, %(response_body)s,
+  %(response_hash)s, %(http_status)s, %(ok)s, %(error_message)s
+)
+on conflict (provider, endpoint, response_hash) do nothing
+returning id;
+"""
+
+
+def _raw_response_params(
     *,
     provider: str,
     endpoint: str,
@@ -30,39 +100,219 @@ def insert_raw_response(
     http_status: int,
     ok: bool,
     error_message: Optional[str] = None,
-) -> Tuple[bool, str]:
-    response_hash = compute_response_hash(response_body)
-
-    sql = """
-    insert into raw.api_responses (
-      provider, endpoint, request_params, response_body,
-      response_hash, http_status, ok, error_message
-    )
-    values (
-      %(provider)s, %(endpoint)s, %(request_params)s, %(response_body)s,
-      %(response_hash)s, %(http_status)s, %(ok)s, %(error_message)s
-    )
-    on conflict (provider, endpoint, response_hash) do nothing
-    returning id;
-    """
+) -> Dict[str, Any]:
+    # serializa 1x: os mesmos bytes alimentam o hash e o jsonb
+    # (hash continua idêntico ao de compute_response_hash)
+    body_bytes = _canonical_bytes(response_body)
 
-    # IMPORTANT: psycopg precisa de Json() para jsonb
-    params = {
+    # IMPORTANT: psycopg precisa de Jsonb() para jsonb
+    return {
         "provider": provider,
         "endpoint": endpoint,
-        "request_params": Json(json.loads(_canonical_json(request_params))),
-        "response_body": Json(json.loads(_canonical_json(response_body))),
-        "response_hash": response_hash,
+        "request_params": _prejson(_canonical_bytes(request_params)),
+        "response_body": _prejson(body_bytes),
+        "response_hash": _digest_hex(body_bytes),
         "http_status": int(http_status),
         "ok": bool(ok),
         "error_message": error_message,
     }
 
-    with pg_conn() as conn:
-        with pg_tx(conn):
-            with conn.cursor() as cur:
-                cur.execute(sql, params)
-                row = cur.fetchone()
+
+def insert_raw_response(
+    *,
+    provider: str,
+    endpoint: str,
+    request_params: Dict[str, Any],
+    response_body: Dict[str, Any],
+    http_status: int,
+    ok: bool,
+    error_message: Optional[str] = None,
+    conn: Optional[psycopg.Connection] = None,
+    known: Optional[AbstractSet[Tuple[str, str, str]]] = None,
+) -> Tuple[bool, str]:
+    """
+    conn: conexão do chamador (sem commit aqui; o chamador controla a transação).
+    Permite várias chamadas na mesma conexão, inclusive dentro de `conn.pipeline()`.
+    known: chaves (provider, endpoint, response_hash) já gravadas (ver load_recent_raw_hashes);
+    hit volta (False, hash) sem tocar no banco.
+    """
+    params = _raw_response_params(
+        provider=provider,
+        endpoint=endpoint,
+        request_params=request_params,
+        response_body=response_body,
+        http_status=http_status,
+        ok=ok,
+        error_message=error_message,
+    )
+
+    if known is not None and (provider, endpoint, params["response_hash"]) in known:
+        return False, params["response_hash"]
+
+    if conn is not None:
+        with conn.cursor() as cur:
+            cur.execute(RAW_RESPONSE_INSERT_SQL, params)
+            row = cur.fetchone()
+    else:
+        with pg_conn() as conn:
+            with pg_tx(conn):
+                with conn.cursor() as cur:
+                    cur.execute(RAW_RESPONSE_INSERT_SQL, params)
+                    row = cur.fetchone()
 
     inserted = row is not None
-    return inserted, response_hash
+    return inserted, params["response_hash"]
+
+
+RAW_RECENT_HASHES_SQL = """
+select provider, endpoint, response_hash
+from raw.api_responses
+where provider = %s and fetched_at_utc > now() - make_interval(hours => %s);
+"""
+
+
+def load_recent_raw_hashes(
+    provider: str,
+    *,
+    hours: int = 48,
+    conn: Optional[psycopg.Connection] = None,
+) -> FrozenSet[Tuple[str, str, str]]:
+    """
+    Chaves de dedup gravadas nas últimas `hours` horas, para passar como `known=`.
+    Re-runs idempotentes deixam de mandar (e de consultar) cada response repetido.
+    """
+    if conn is None:
+        with pg_conn() as conn:
+            return load_recent_raw_hashes(provider, hours=hours, conn=conn)
+
+    with conn.cursor() as cur:
+        cur.execute(RAW_RECENT_HASHES_SQL, (provider, int(hours)))
+        return frozenset(cur.fetchall())
+
+
+RAW_EXISTING_HASHES_SQL = """
+select provider, endpoint, response_hash
+from raw.api_responses
+where provider = any(%s) and response_hash = any(%s);
+"""
+
+
+# A partir deste tamanho o bulk vai por COPY numa temp table + 1 INSERT ... SELECT.
+RAW_COPY_MIN_ROWS = int(os.getenv("RAW_COPY_MIN_ROWS", "50"))
+
+_RAW_COPY_COLUMNS = (
+    "provider", "endpoint", "request_params", "response_body",
+    "response_hash", "http_status", "ok", "error_message",
+)
+
+
+def _copy_raw_params(cur: Any, params: List[Dict[str, Any]]) -> Set[Tuple[str, str, str]]:
+    """
+    COPY dos params para staging e INSERT ... ON CONFLICT DO NOTHING.
+    Retorna as chaves (provider, endpoint, response_hash) realmente inseridas.
+    """
+    cols = ", ".join(_RAW_COPY_COLUMNS)
+    # colunas explícitas (sem LIKE): o default do id consumiria a sequence do RAW
+    cur.execute(
+        """
+        create temp table stg_raw_api_responses (
+          provider text, endpoint text, request_params jsonb, response_body jsonb,
+          response_hash text, http_status int, ok boolean, error_message text
+        ) on commit drop
+        """
+    )
+    with cur.copy(f"copy stg_raw_api_responses ({cols}) from stdin") as cp:
+        for p in params:
+            cp.write_row(tuple(p[c] for c in _RAW_COPY_COLUMNS))
+
+    cur.execute(
+        f"""
+        insert into raw.api_responses ({cols})
+        select {cols} from stg_raw_api_responses
+        on conflict (provider, endpoint, response_hash) do nothing
+        returning provider, endpoint, response_hash
+        """
+    )
+    new_keys = set(cur.fetchall())
+    # drop explícito: a mesma transação pode fazer outro flush
+    cur.execute("drop table stg_raw_api_responses")
+    return new_keys
+
+
+def insert_raw_responses_bulk(
+    rows: List[Dict[str, Any]],
+    *,
+    conn: Optional[psycopg.Connection] = None,
+    known: Optional[AbstractSet[Tuple[str, str, str]]] = None,
+) -> List[Tuple[bool, str]]:
+    """
+    Mesmo contrato de insert_raw_response, para vários responses de uma vez:
+    1 conexão, 1 transação e binds em pipeline (executemany).
+    Retorna (inserted, response_hash) na mesma ordem de `rows`.
+    conn: conexão do chamador (sem commit aqui).
+    """
+    if not rows:
+        return []
+    return _insert_raw_params_bulk([_raw_response_params(**r) for r in rows], conn=conn, known=known)
+
+
+def _insert_raw_params_bulk(
+    params: List[Dict[str, Any]],
+    *,
+    conn: Optional[psycopg.Connection] = None,
+    known: Optional[AbstractSet[Tuple[str, str, str]]] = None,
+) -> List[Tuple[bool, str]]:
+    # params já montados por _raw_response_params (bodies já serializados)
+    if not params:
+        return []
+
+    keys = [(p["provider"], p["endpoint"], p["response_hash"]) for p in params]
+    inserted = [False] * len(params)
+
+    # tudo já conhecido pelo chamador: nem abre conexão
+    if known is not None and all(k in known for k in keys):
+        return [(False, k[2]) for k in keys]
+
+    if conn is None:
+        with pg_conn() as conn:
+            with pg_tx(conn):
+                return _insert_raw_params_bulk(params, conn=conn, known=known)
+
+    with conn.cursor() as cur:
+        # dedup antes do INSERT: hashes já gravados (1 select pelo índice de
+        # response_hash) e repetidos dentro do lote não trafegam o body.
+        # `known` (do chamador) já corta do select o que foi visto em runs recentes.
+        ask = keys if known is None else [k for k in keys if k not in known]
+        seen: Set[Tuple[str, str, str]] = set()
+        if ask:
+            cur.execute(
+                RAW_EXISTING_HASHES_SQL,
+                (list({k[0] for k in ask}), list({k[2] for k in ask})),
+            )
+            seen.update(cur.fetchall())
+
+        todo: List[int] = []
+        for i, k in enumerate(keys):
+            if k in seen or (known is not None and k in known):
+                continue
+            seen.add(k)
+            todo.append(i)
+
+        # COPY não roda em pipeline mode; lá (e em lotes pequenos) fica o executemany
+        use_copy = (
+            len(todo) >= RAW_COPY_MIN_ROWS
+            and conn.info.pipeline_status == pq.PipelineStatus.OFF
+        )
+        if use_copy:
+            new_keys = _copy_raw_params(cur, [params[i] for i in todo])
+            for i in todo:
+                inserted[i] = keys[i] in new_keys
+        elif todo:
+            # returning=True: um result set por linha, na ordem dos params
+            # (corrida com outro writer continua caindo no "do nothing").
+            cur.executemany(RAW_RESPONSE_INSERT_SQL, [params[i] for i in todo], returning=True)
+            for i in todo:
+                inserted[i] = cur.fetchone() is not None
+                cur.nextset()
+
+    return [(ok, k[2]) for ok, k in zip(inserted, keys)]
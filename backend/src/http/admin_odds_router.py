@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 import math
 import re
 import time
@@ -8,10 +10,11 @@ import unicodedata
 from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from psycopg_pool import PoolTimeout
 from pydantic import BaseModel
 
 from src.core.settings import load_settings
-from src.db.pg import pg_conn
+from src.db.pg import pg_conn, pg_tx, pool_max_size
 from src.integrations.theodds.client import TheOddsClient, TheOddsApiError
 from src.internal_access.guards import require_admin_access
 from src.models.one_x_two_logreg_v1 import predict_1x2_from_artifact
@@ -45,6 +48,15 @@ class AdminLeagueCountryUpdateBody(BaseModel):
 # MVP: default artifact (ajuste se você quiser centralizar isso em settings)
 DEFAULT_EPL_ARTIFACT = "epl_1x2_logreg_v1_C_2021_2023_C0.3.json"
 
+# /queue/intel: predições simultâneas. Cada uma usa 1 conexão do pool: no máximo metade
+# do PG_POOL_MAX por request, para 2 requests juntos não esgotarem o pool.
+_INTEL_PREDICT_WORKERS_MAX = 8
+INTEL_PREDICT_WORKERS = (
+    max(1, min(_INTEL_PREDICT_WORKERS_MAX, pool_max_size() // 2))
+    if pool_max_size() > 0
+    else _INTEL_PREDICT_WORKERS_MAX
+)
+
 def _empty_runtime_counts() -> Dict[str, int]:
     return {
         "ok_exact": 0,
@@ -77,6 +89,7 @@ def _classify_model_runtime_error(msg: Optional[str]) -> str:
     return "MODEL_ERROR"
 
 _STOPWORDS = {"fc", "cf", "sc", "ac", "afc", "cfc", "the", "club", "de", "da", "do", "and", "&"}
+_NORM_STRIP_RE = re.compile(r"[^a-z0-9\s]")
 
 def _load_approved_league_map(conn, *, sport_key: str) -> Optional[Dict[str, Any]]:
     sql = """
@@ -195,58 +208,99 @@ def _client() -> TheOddsClient:
     )
 
 
+# nomes de time se repetem entre eventos e requests (NFKD + regex por nome só 1x)
+@lru_cache(maxsize=4096)
 def _norm_name(s: str) -> str:
     s = (s or "").strip().lower()
     s = unicodedata.normalize("NFKD", s)
     s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = re.sub(r"[^a-z0-9\\s]", " ", s)
+    s = _NORM_STRIP_RE.sub(" ", s)
     parts = [p for p in s.split() if p and p not in _STOPWORDS]
     return " ".join(parts).strip()
 
 
 def _find_team_id(conn, raw_name: str, limit_suggestions: int = 5) -> Tuple[Optional[int], str, List[Dict[str, Any]]]:
-    name_norm = _norm_name(raw_name)
-    if not name_norm:
-        return None, "NONE", []
+    return _find_team_ids_bulk(conn, [raw_name], limit_suggestions)[raw_name]
+
+
+def _find_team_ids_bulk(
+    conn,
+    raw_names: List[str],
+    limit_suggestions: int = 5,
+) -> Dict[str, Tuple[Optional[int], str, List[Dict[str, Any]]]]:
+    """
+    _find_team_id para vários nomes: 1 query EXACT + 1 query de tokens para o resto
+    (antes: 1-2 round-trips por nome). Retorna raw_name -> (team_id, match_type, suggestions).
+    """
+    out: Dict[str, Tuple[Optional[int], str, List[Dict[str, Any]]]] = {}
+    pending: Dict[str, str] = {}  # raw_name -> name_norm
+    for raw_name in dict.fromkeys(raw_names):
+        name_norm = _norm_name(raw_name)
+        if name_norm:
+            pending[raw_name] = name_norm
+        else:
+            out[raw_name] = (None, "NONE", [])
+
+    if not pending:
+        return out
 
     # EXACT
     sql_exact = """
-      SELECT team_id, name, country_name
+      SELECT DISTINCT ON (lower(name)) lower(name), team_id
       FROM core.teams
-      WHERE lower(name) = %(n)s
-      LIMIT 1
+      WHERE lower(name) = ANY(%(n)s)
     """
     with conn.cursor() as cur:
-        cur.execute(sql_exact, {"n": raw_name.strip().lower()})
-        row = cur.fetchone()
-        if row:
-            return int(row[0]), "EXACT", []
-
-    # Token ILIKE fallback
-    tokens = [t for t in name_norm.split() if t]
-    if not tokens:
-        return None, "NONE", []
+        cur.execute(sql_exact, {"n": list({r.strip().lower() for r in pending})})
+        exact = {str(n): int(tid) for n, tid in cur.fetchall()}
+
+    residual: Dict[str, List[str]] = {}  # name_norm -> raw_names
+    for raw_name, name_norm in pending.items():
+        tid = exact.get(raw_name.strip().lower())
+        if tid is not None:
+            out[raw_name] = (tid, "EXACT", [])
+        else:
+            residual.setdefault(name_norm, []).append(raw_name)
 
-    where = " AND ".join([f"lower(name) ILIKE %(t{i})s" for i in range(len(tokens))])
-    params = {f"t{i}": f"%{tok}%" for i, tok in enumerate(tokens)}
+    if not residual:
+        return out
 
-    sql_like = f"""
-      SELECT team_id, name, country_name
-      FROM core.teams
-      WHERE {where}
-      ORDER BY name ASC
-      LIMIT {limit_suggestions}
+    # Token ILIKE fallback: todos os tokens do nome (AND), por nome via LATERAL.
+    # name_norm só tem [a-z0-9 ], então os tokens não precisam de escape no ILIKE.
+    # O token mais longo vai num ILIKE escalar: é ele que o GIN trigram de lower(name)
+    # consegue usar (migrations/2026-10-16_core_teams_name_trgm_v1.sql); o ILIKE ALL
+    # confirma os demais, mesmo resultado do AND de ILIKEs.
+    sql_like = """
+      SELECT q.norm, t.team_id, t.name, t.country_name
+      FROM unnest(%(norms)s::text[], %(keys)s::text[]) AS q(norm, key)
+      CROSS JOIN LATERAL (
+        SELECT team_id, name, country_name
+        FROM core.teams
+        WHERE lower(name) ILIKE '%%' || q.key || '%%'
+          AND lower(name) ILIKE ALL (
+            ARRAY(SELECT '%%' || tok || '%%' FROM unnest(string_to_array(q.norm, ' ')) AS tok)
+          )
+        ORDER BY name ASC
+        LIMIT %(k)s
+      ) t
+      ORDER BY q.norm, t.name ASC
     """
+    norms = list(residual)
+    keys = [max(n.split(), key=len) for n in norms]
+    sugg_by_norm: Dict[str, List[Dict[str, Any]]] = {}
     with conn.cursor() as cur:
-        cur.execute(sql_like, params)
-        rows = cur.fetchall()
-
-    if not rows:
-        return None, "NONE", []
+        cur.execute(sql_like, {"norms": norms, "keys": keys, "k": int(limit_suggestions)})
+        for norm, team_id, name, country in cur.fetchall():
+            sugg_by_norm.setdefault(str(norm), []).append(
+                {"team_id": int(team_id), "name": str(name), "country": (str(country) if country else None)}
+            )
 
-    best_id = int(rows[0][0])
-    sugg = [{"team_id": int(r[0]), "name": str(r[1]), "country": (str(r[2]) if r[2] else None)} for r in rows]
-    return best_id, "ILIKE", sugg
+    for name_norm, names in residual.items():
+        sugg = sugg_by_norm.get(name_norm)
+        res = (int(sugg[0]["team_id"]), "ILIKE", sugg) if sugg else (None, "NONE", [])
+        for raw_name in names:
+            out[raw_name] = res
+    return out
 
 
 def _try_find_fixture(conn, kickoff_utc_iso: str, home_team_id: int, away_team_id: int, tol_hours: int = 36):
@@ -281,24 +335,119 @@ def _try_find_fixture(conn, kickoff_utc_iso: str, home_team_id: int, away_team_i
 
 
 def _market_probs_from_odds(odds_h: float | None, odds_d: float | None, odds_a: float | None):
-    vals = []
-    for o in (odds_h, odds_d, odds_a):
-        vals.append((1.0 / o) if (o and o > 0) else None)
+    # 3 lados desenrolados (sem lista/generators/dict comprehension): chamado 1x por evento
+    h = (1.0 / odds_h) if (odds_h and odds_h > 0) else None
+    d = (1.0 / odds_d) if (odds_d and odds_d > 0) else None
+    a = (1.0 / odds_a) if (odds_a and odds_a > 0) else None
 
-    if all(v is None for v in vals):
+    if h is None and d is None and a is None:
         return {"raw": None, "novig": None, "overround": None}
 
-    raw = {"H": vals[0], "D": vals[1], "A": vals[2]}
-    s = sum(v for v in vals if v is not None)
+    raw = {"H": h, "D": d, "A": a}
+    s = (h or 0.0) + (d or 0.0) + (a or 0.0)
     if s <= 0:
         return {"raw": raw, "novig": None, "overround": None}
 
-    novig = {k: (v / s if v is not None else None) for k, v in raw.items()}
+    novig = {
+        "H": h / s if h is not None else None,
+        "D": d / s if d is not None else None,
+        "A": a / s if a is not None else None,
+    }
     return {"raw": raw, "novig": novig, "overround": s}
 
 
-def _audit_insert_prediction(
-    conn,
+AUDIT_PREDICTION_UPSERT_SQL = """
+  INSERT INTO odds.audit_predictions (
+    event_id,
+    sport_key,
+    kickoff_utc,
+    captured_at_utc,
+    bookmaker,
+    market,
+    league_id,
+    season,
+    fixture_id,
+    home_team_id,
+    away_team_id,
+    match_confidence,
+    artifact_filename,
+    odds_h,
+    odds_d,
+    odds_a,
+    p_mkt_h,
+    p_mkt_d,
+    p_mkt_a,
+    p_model_h,
+    p_model_d,
+    p_model_a,
+    best_side,
+    best_ev,
+    status,
+    reason,
+    created_at_utc,
+    updated_at_utc
+  )
+  VALUES (
+    %(event_id)s,
+    %(sport_key)s,
+    (%(kickoff_utc)s)::timestamptz,
+    (%(captured_at_utc)s)::timestamptz,
+    %(bookmaker)s,
+    %(market)s,
+    %(league_id)s,
+    %(season)s,
+    %(fixture_id)s,
+    %(home_team_id)s,
+    %(away_team_id)s,
+    %(match_confidence)s,
+    %(artifact_filename)s,
+    %(odds_h)s,
+    %(odds_d)s,
+    %(odds_a)s,
+    %(p_mkt_h)s,
+    %(p_mkt_d)s,
+    %(p_mkt_a)s,
+    %(p_model_h)s,
+    %(p_model_d)s,
+    %(p_model_a)s,
+    %(best_side)s,
+    %(best_ev)s,
+    %(status)s,
+    %(reason)s,
+    now(),
+    now()
+  )
+  ON CONFLICT (event_id, artifact_filename, captured_at_utc)
+  DO UPDATE SET
+    sport_key = EXCLUDED.sport_key,
+    kickoff_utc = EXCLUDED.kickoff_utc,
+    captured_at_utc = EXCLUDED.captured_at_utc,
+    bookmaker = EXCLUDED.bookmaker,
+    market = EXCLUDED.market,
+    league_id = EXCLUDED.league_id,
+    season = EXCLUDED.season,
+    fixture_id = EXCLUDED.fixture_id,
+    home_team_id = EXCLUDED.home_team_id,
+    away_team_id = EXCLUDED.away_team_id,
+    match_confidence = EXCLUDED.match_confidence,
+    odds_h = EXCLUDED.odds_h,
+    odds_d = EXCLUDED.odds_d,
+    odds_a = EXCLUDED.odds_a,
+    p_mkt_h = EXCLUDED.p_mkt_h,
+    p_mkt_d = EXCLUDED.p_mkt_d,
+    p_mkt_a = EXCLUDED.p_mkt_a,
+    p_model_h = EXCLUDED.p_model_h,
+    p_model_d = EXCLUDED.p_model_d,
+    p_model_a = EXCLUDED.p_model_a,
+    best_side = EXCLUDED.best_side,
+    best_ev = EXCLUDED.best_ev,
+    status = EXCLUDED.status,
+    reason = EXCLUDED.reason,
+    updated_at_utc = now()
+"""
+
+
+def _audit_prediction_params(
     *,
     event_id: str,
     sport_key: str,
@@ -322,103 +471,8 @@ def _audit_insert_prediction(
     best_ev: Optional[float],
     status: str,
     reason: Optional[str],
-) -> None:
-    """
-    Persistência de auditoria (para depois comparar com resultado real).
-    Se a tabela não existir / schema diferente, a chamada falha e será capturada no caller.
-    """
-
-    sql = """
-      INSERT INTO odds.audit_predictions (
-        event_id,
-        sport_key,
-        kickoff_utc,
-        captured_at_utc,
-        bookmaker,
-        market,
-        league_id,
-        season,
-        fixture_id,
-        home_team_id,
-        away_team_id,
-        match_confidence,
-        artifact_filename,
-        odds_h,
-        odds_d,
-        odds_a,
-        p_mkt_h,
-        p_mkt_d,
-        p_mkt_a,
-        p_model_h,
-        p_model_d,
-        p_model_a,
-        best_side,
-        best_ev,
-        status,
-        reason,
-        created_at_utc,
-        updated_at_utc
-      )
-      VALUES (
-        %(event_id)s,
-        %(sport_key)s,
-        (%(kickoff_utc)s)::timestamptz,
-        (%(captured_at_utc)s)::timestamptz,
-        %(bookmaker)s,
-        %(market)s,
-        %(league_id)s,
-        %(season)s,
-        %(fixture_id)s,
-        %(home_team_id)s,
-        %(away_team_id)s,
-        %(match_confidence)s,
-        %(artifact_filename)s,
-        %(odds_h)s,
-        %(odds_d)s,
-        %(odds_a)s,
-        %(p_mkt_h)s,
-        %(p_mkt_d)s,
-        %(p_mkt_a)s,
-        %(p_model_h)s,
-        %(p_model_d)s,
-        %(p_model_a)s,
-        %(best_side)s,
-        %(best_ev)s,
-        %(status)s,
-        %(reason)s,
-        now(),
-        now()
-      )
-      ON CONFLICT (event_id, artifact_filename, captured_at_utc)
-      DO UPDATE SET
-        sport_key = EXCLUDED.sport_key,
-        kickoff_utc = EXCLUDED.kickoff_utc,
-        captured_at_utc = EXCLUDED.captured_at_utc,
-        bookmaker = EXCLUDED.bookmaker,
-        market = EXCLUDED.market,
-        league_id = EXCLUDED.league_id,
-        season = EXCLUDED.season,
-        fixture_id = EXCLUDED.fixture_id,
-        home_team_id = EXCLUDED.home_team_id,
-        away_team_id = EXCLUDED.away_team_id,
-        match_confidence = EXCLUDED.match_confidence,
-        odds_h = EXCLUDED.odds_h,
-        odds_d = EXCLUDED.odds_d,
-        odds_a = EXCLUDED.odds_a,
-        p_mkt_h = EXCLUDED.p_mkt_h,
-        p_mkt_d = EXCLUDED.p_mkt_d,
-        p_mkt_a = EXCLUDED.p_mkt_a,
-        p_model_h = EXCLUDED.p_model_h,
-        p_model_d = EXCLUDED.p_model_d,
-        p_model_a = EXCLUDED.p_model_a,
-        best_side = EXCLUDED.best_side,
-        best_ev = EXCLUDED.best_ev,
-        status = EXCLUDED.status,
-        reason = EXCLUDED.reason,
-        updated_at_utc = now()
-    """
-
-    params = {
+) -> Dict[str, Any]:
+    return {
         "event_id": event_id,
         "sport_key": sport_key,
         "kickoff_utc": kickoff_utc,
@@ -447,8 +501,25 @@ def _audit_insert_prediction(
         "match_confidence": match_confidence,
     }
 
+
+def _audit_insert_predictions(conn, rows: List[Dict[str, Any]]) -> None:
+    """
+    Persistência de auditoria (para depois comparar com resultado real), em lote:
+    1 executemany (binds em pipeline) na conexão do chamador, sem commit aqui.
+    executemany (e não 1 INSERT multi-VALUES): o mesmo (event_id, artifact, captured_at)
+    pode repetir no lote, e ON CONFLICT DO UPDATE não atualiza a mesma linha 2x num comando.
+    Se a tabela não existir / schema diferente, a chamada falha e será capturada no caller.
+    """
+    if not rows:
+        return
+    with conn.cursor() as cur:
+        cur.executemany(AUDIT_PREDICTION_UPSERT_SQL, rows)
+
+
+def _audit_insert_prediction(conn, **kwargs: Any) -> None:
+    # 1 evento (mesmos kwargs de _audit_prediction_params), sem commit aqui
     with conn.cursor() as cur:
-        cur.execute(sql, params)
+        cur.execute(AUDIT_PREDICTION_UPSERT_SQL, _audit_prediction_params(**kwargs))
 
 
 @router.get("/sports")
@@ -1494,9 +1565,16 @@ def admin_odds_upcoming_orchestrate(
         raise HTTPException(status_code=500, detail=str(e))
 
     out: List[Dict[str, Any]] = []
+    events = raw[:limit]
 
     with pg_conn() as conn:
-        for ev in raw[:limit]:
+        # todos os times do lote resolvidos de uma vez (2 queries no total, não 2 por evento)
+        teams = _find_team_ids_bulk(
+            conn,
+            [str(ev.get(k) or "") for ev in events for k in ("home_team", "away_team")],
+        )
+
+        for ev in events:
             event_id = ev.get("id")
             commence_time = ev.get("commence_time")
             home = str(ev.get("home_team") or "")
@@ -1521,8 +1599,8 @@ def admin_odds_upcoming_orchestrate(
                     elif name.lower() in ("draw", "tie", "empate"):
                         odds_d = float(price)
 
-            home_id, home_type, home_sugg = _find_team_id(conn, home)
-            away_id, away_type, away_sugg = _find_team_id(conn, away)
+            home_id, home_type, home_sugg = teams[home]
+            away_id, away_type, away_sugg = teams[away]
 
             fixture = None
             if home_id and away_id and commence_time:
@@ -1625,18 +1703,6 @@ def admin_odds_queue(
     end_utc = now_utc + timedelta(hours=hours_ahead)
 
     sql = """
-      WITH latest AS (
-        SELECT DISTINCT ON (s.event_id)
-          s.event_id,
-          s.bookmaker,
-          s.market,
-          s.odds_home,
-          s.odds_draw,
-          s.odds_away,
-          s.captured_at_utc
-        FROM odds.odds_snapshots_1x2 s
-        ORDER BY s.event_id, s.captured_at_utc DESC
-      )
       SELECT
         e.event_id,
         e.sport_key,
@@ -1655,7 +1721,21 @@ def admin_odds_queue(
         l.captured_at_utc,
         EXTRACT(EPOCH FROM (now() - l.captured_at_utc))::int AS freshness_seconds
       FROM odds.odds_events e
-      JOIN latest l ON l.event_id = e.event_id
+      -- último snapshot por evento: 1 seek no índice (event_id, captured_at_utc DESC)
+      -- por evento filtrado, em vez de DISTINCT ON sobre a tabela de snapshots inteira
+      CROSS JOIN LATERAL (
+        SELECT
+          s.bookmaker,
+          s.market,
+          s.odds_home,
+          s.odds_draw,
+          s.odds_away,
+          s.captured_at_utc
+        FROM odds.odds_snapshots_1x2 s
+        WHERE s.event_id = e.event_id
+        ORDER BY s.captured_at_utc DESC
+        LIMIT 1
+      ) l
       WHERE ((%(sport_key)s)::text IS NULL OR e.sport_key = (%(sport_key)s)::text)
         AND (
           e.commence_time_utc IS NULL
@@ -1779,18 +1859,6 @@ def admin_odds_queue_intel(
         conf_clause = "e.match_confidence IN ('ILIKE','EXACT')"
 
     sql = f"""
-      WITH latest AS (
-        SELECT DISTINCT ON (s.event_id)
-          s.event_id,
-          s.bookmaker,
-          s.market,
-          s.odds_home,
-          s.odds_draw,
-          s.odds_away,
-          s.captured_at_utc
-        FROM odds.odds_snapshots_1x2 s
-        ORDER BY s.event_id, s.captured_at_utc DESC
-      )
       SELECT
         e.event_id,
         e.sport_key,
@@ -1809,7 +1877,21 @@ def admin_odds_queue_intel(
         l.captured_at_utc,
         EXTRACT(EPOCH FROM (now() - l.captured_at_utc))::int AS freshness_seconds
       FROM odds.odds_events e
-      JOIN latest l ON l.event_id = e.event_id
+      -- último snapshot por evento: 1 seek no índice (event_id, captured_at_utc DESC)
+      -- por evento filtrado, em vez de DISTINCT ON sobre a tabela de snapshots inteira
+      CROSS JOIN LATERAL (
+        SELECT
+          s.bookmaker,
+          s.market,
+          s.odds_home,
+          s.odds_draw,
+          s.odds_away,
+          s.captured_at_utc
+        FROM odds.odds_snapshots_1x2 s
+        WHERE s.event_id = e.event_id
+        ORDER BY s.captured_at_utc DESC
+        LIMIT 1
+      ) l
       WHERE ((%(sport_key)s)::text IS NULL OR e.sport_key = (%(sport_key)s)::text)
         AND (e.commence_time_utc IS NULL OR (e.commence_time_utc >= now() AND e.commence_time_utc <= (%(end)s)::timestamptz))
         AND ({conf_clause})
@@ -1820,6 +1902,8 @@ def admin_odds_queue_intel(
     """
     params = {"sport_key": sport_key, "end": end_utc, "limit": limit}
 
+    # SELECT numa conexão curta: ela volta ao pool (sem transação aberta) antes do
+    # fan-out das predições, que pegam as suas próprias conexões
     try:
         with pg_conn() as conn:
             with conn.cursor() as cur:
@@ -1836,27 +1920,63 @@ def admin_odds_queue_intel(
         "model_error": 0,
     }
     runtime_counts = _empty_runtime_counts()
+    audit_batch: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
 
     matchup_snapshots_error_msg: Optional[str] = None
 
+    # league/season assumidos e ids dos times: calculados 1x por row, usados no submit e no loop
+    league_id = int(assume_league_id) if assume_league_id else None
+    season = int(assume_season) if assume_season else None
+    team_ids: List[Tuple[Optional[int], Optional[int]]] = [
+        (
+            int(resolved_home_team_id) if resolved_home_team_id is not None else None,
+            int(resolved_away_team_id) if resolved_away_team_id is not None else None,
+        )
+        for (_, _, _, _, _, resolved_home_team_id, resolved_away_team_id, *_) in rows
+    ]
+
+    # predições em paralelo (build_match_features lê o DB: I/O bound, cada thread
+    # pega sua conexão do pool). O loop abaixo segue serial e na ordem dos rows;
+    # f.result() re-levanta o erro do modelo no mesmo try de antes.
+    pred_futures: List[Optional[Future]] = []
+    with ThreadPoolExecutor(max_workers=INTEL_PREDICT_WORKERS) as pool:
+        for home_id, away_id in team_ids:
+            if not home_id or not away_id:
+                pred_futures.append(None)
+                continue
+            pred_futures.append(
+                pool.submit(
+                    predict_1x2_from_artifact,
+                    artifact_filename=artifact_filename,
+                    league_id=league_id,
+                    season=season,
+                    home_team_id=home_id,
+                    away_team_id=away_id,
+                )
+            )
+
     for (
-        event_id,
-        sport_key_db,
-        commence_time_utc,
-        home_name,
-        away_name,
-        resolved_home_team_id,
-        resolved_away_team_id,
-        resolved_fixture_id,
-        match_confidence,
-        bookmaker,
-        market,
-        odds_home,
-        odds_draw,
-        odds_away,
-        captured_at_utc,
-        freshness_seconds,
-    ) in rows:
+        (
+            event_id,
+            sport_key_db,
+            commence_time_utc,
+            home_name,
+            away_name,
+            _,
+            _,
+            resolved_fixture_id,
+            match_confidence,
+            bookmaker,
+            market,
+            odds_home,
+            odds_draw,
+            odds_away,
+            captured_at_utc,
+            freshness_seconds,
+        ),
+        (home_id, away_id),
+        pred_future,
+    ) in zip(rows, team_ids, pred_futures):
         counters["total"] += 1
 
         kickoff_iso = (
@@ -1875,18 +1995,13 @@ def admin_odds_queue_intel(
         market_probs = _market_probs_from_odds(oh, od, oa)
         p_mkt = market_probs.get("novig")
 
-        home_id = int(resolved_home_team_id) if resolved_home_team_id is not None else None
-        away_id = int(resolved_away_team_id) if resolved_away_team_id is not None else None
-
         fixture_id = int(resolved_fixture_id) if resolved_fixture_id is not None else None
 
-        league_id = int(assume_league_id) if assume_league_id else None
-        season = int(assume_season) if assume_season else None
-
         model_block: Optional[Dict[str, Any]] = None
         status = "ok"
         reason = None
         persist_error: Optional[str] = None
+        audit_params: Optional[Dict[str, Any]] = None
 
         if not home_id or not away_id:
             status = "incomplete"
@@ -1894,13 +2009,7 @@ def admin_odds_queue_intel(
             counters["missing_team"] += 1
         else:
             try:
-                pred = predict_1x2_from_artifact(
-                    artifact_filename=artifact_filename,
-                    league_id=league_id,
-                    season=season,
-                    home_team_id=home_id,
-                    away_team_id=away_id,
-                )
+                pred = pred_future.result()
                 p_model = pred["probs"]
 
                 match_stats_mode = _read_match_stats_mode_from_pred(pred)
@@ -1950,37 +2059,34 @@ def admin_odds_queue_intel(
                 else:
                     runtime_counts["ok_exact"] += 1
 
-                try:
-                    with pg_conn() as conn:
-                        _audit_insert_prediction(
-                            conn,
-                            event_id=str(event_id),
-                            sport_key=str(sport_key_db),
-                            kickoff_utc=kickoff_iso,
-                            captured_at_utc=captured_iso,
-                            bookmaker=(str(bookmaker) if bookmaker is not None else None),
-                            market=(str(market) if market is not None else None),
-                            league_id=league_id,
-                            season=season,
-                            fixture_id=fixture_id,
-                            home_team_id=home_id,
-                            away_team_id=away_id,
-                            artifact_filename=artifact_filename,
-                            odds_h=oh,
-                            odds_d=od,
-                            odds_a=oa,
-                            p_mkt=p_mkt,
-                            p_model=p_model,
-                            best_side=best_side,
-                            best_ev=best_ev,
-                            status="ok",
-                            reason=None,
-                            match_confidence=match_confidence,
-                        )
-                        conn.commit()
-                except Exception as pe:
-                    persist_error = str(pe)
+                audit_params = _audit_prediction_params(
+                    event_id=str(event_id),
+                    sport_key=str(sport_key_db),
+                    kickoff_utc=kickoff_iso,
+                    captured_at_utc=captured_iso,
+                    bookmaker=(str(bookmaker) if bookmaker is not None else None),
+                    market=(str(market) if market is not None else None),
+                    league_id=league_id,
+                    season=season,
+                    fixture_id=fixture_id,
+                    home_team_id=home_id,
+                    away_team_id=away_id,
+                    artifact_filename=artifact_filename,
+                    odds_h=oh,
+                    odds_d=od,
+                    odds_a=oa,
+                    p_mkt=p_mkt,
+                    p_model=p_model,
+                    best_side=best_side,
+                    best_ev=best_ev,
+                    status="ok",
+                    reason=None,
+                    match_confidence=match_confidence,
+                )
 
+            except PoolTimeout as e:
+                # pool do DB esgotado não é erro do modelo: não vira "incomplete" na auditoria
+                raise HTTPException(status_code=503, detail=f"db pool exhausted: {e}")
             except Exception as e:
                 err_msg = str(e)
                 classified_reason = _classify_model_runtime_error(err_msg)
@@ -2001,36 +2107,30 @@ def admin_odds_queue_intel(
                     "model_status": classified_reason,
                 }
 
-                try:
-                    with pg_conn() as conn:
-                        _audit_insert_prediction(
-                            conn,
-                            event_id=str(event_id),
-                            sport_key=str(sport_key_db),
-                            kickoff_utc=kickoff_iso,
-                            captured_at_utc=captured_iso,
-                            bookmaker=(str(bookmaker) if bookmaker is not None else None),
-                            market=(str(market) if market is not None else None),
-                            league_id=league_id,
-                            season=season,
-                            fixture_id=fixture_id,
-                            home_team_id=home_id,
-                            away_team_id=away_id,
-                            artifact_filename=artifact_filename,
-                            odds_h=oh,
-                            odds_d=od,
-                            odds_a=oa,
-                            p_mkt=p_mkt,
-                            p_model=None,
-                            best_side=None,
-                            best_ev=None,
-                            status="incomplete",
-                            reason=reason,
-                            match_confidence=match_confidence,
-                        )
-                        conn.commit()
-                except Exception as pe:
-                    persist_error = str(pe)
+                audit_params = _audit_prediction_params(
+                    event_id=str(event_id),
+                    sport_key=str(sport_key_db),
+                    kickoff_utc=kickoff_iso,
+                    captured_at_utc=captured_iso,
+                    bookmaker=(str(bookmaker) if bookmaker is not None else None),
+                    market=(str(market) if market is not None else None),
+                    league_id=league_id,
+                    season=season,
+                    fixture_id=fixture_id,
+                    home_team_id=home_id,
+                    away_team_id=away_id,
+                    artifact_filename=artifact_filename,
+                    odds_h=oh,
+                    odds_d=od,
+                    odds_a=oa,
+                    p_mkt=p_mkt,
+                    p_model=None,
+                    best_side=None,
+                    best_ev=None,
+                    status="incomplete",
+                    reason=reason,
+                    match_confidence=match_confidence,
+                )
 
         item = {
             "event_id": event_id,
@@ -2058,6 +2158,19 @@ def admin_odds_queue_intel(
             "persist_error": persist_error,
         }
         items.append(item)
+        if audit_params is not None:
+            audit_batch.append((item, audit_params))
+
+    # auditoria em lote: 1 executemany e 1 commit para todos os eventos, numa conexão
+    # pega só para a escrita. Falha marca persist_error no lote.
+    if audit_batch:
+        try:
+            with pg_conn() as conn:
+                with pg_tx(conn):
+                    _audit_insert_predictions(conn, [p for _, p in audit_batch])
+        except Exception as pe:
+            for it, _ in audit_batch:
+                it["persist_error"] = str(pe)
 
     def _key(it: Dict[str, Any]):
         if sort == "kickoff":
@@ -2411,104 +2411,103 @@ def admin_refresh_fixtures(
     """
 
     s = load_settings()
-    client = ApiFootballClient(
+    with ApiFootballClient(
         base_url=s.apifootball_base_url,
         api_key=s.apifootball_key,
         timeout_s=int(s.app_defaults.get("http_timeout_s", 30)),
-    )
-
-    calls_left = int(max_calls)
-
-    # janela futura (UTC) para puxar fixtures (sempre definida)
-    now_utc = datetime.now(timezone.utc)
-    to_utc = now_utc + timedelta(days=int(days_ahead))
-    from_ymd = now_utc.date().isoformat()
-    to_ymd = to_utc.date().isoformat()
-
-    # ✅ season opcional: inferir "current" via API-Football quando season=None
-    if season is None:
-        status, payload = client.get("/leagues", {"id": int(league_id)})
-        if 200 <= int(status) < 300 and isinstance(payload, dict):
-            resp = payload.get("response") or []
-            found = None
-            if resp and isinstance(resp, list) and isinstance(resp[0], dict):
-                seasons = (resp[0].get("seasons") or [])
-                for srow in seasons:
-                    if isinstance(srow, dict) and srow.get("current") is True:
-                        found = srow.get("year")
-                        break
-            if found is not None:
-                season = int(found)
-
-    # fallback final: se ainda None, usa ano atual (último recurso)
-    if season is None:
-        season = int(now_utc.year)
-
-    # ✅ report precisa existir ANTES do ingest()
-    report = {
-        "ok": True,
-        "plan": {
-            "league_id": int(league_id),
-            "season": int(season),
-            "days_ahead": int(days_ahead),
-            "max_calls": int(max_calls),
-        },
-        "raw": {"leagues": 0, "teams": 0, "fixtures": 0, "dedup": 0},
-        "core": {},
-        "calls": {"ok": 0, "fail": 0},
-    }
+    ) as client:
+        calls_left = int(max_calls)
+
+        # janela futura (UTC) para puxar fixtures (sempre definida)
+        now_utc = datetime.now(timezone.utc)
+        to_utc = now_utc + timedelta(days=int(days_ahead))
+        from_ymd = now_utc.date().isoformat()
+        to_ymd = to_utc.date().isoformat()
+
+        # ✅ season opcional: inferir "current" via API-Football quando season=None
+        if season is None:
+            status, payload = client.get("/leagues", {"id": int(league_id)})
+            if 200 <= int(status) < 300 and isinstance(payload, dict):
+                resp = payload.get("response") or []
+                found = None
+                if resp and isinstance(resp, list) and isinstance(resp[0], dict):
+                    seasons = (resp[0].get("seasons") or [])
+                    for srow in seasons:
+                        if isinstance(srow, dict) and srow.get("current") is True:
+                            found = srow.get("year")
+                            break
+                if found is not None:
+                    season = int(found)
+
+        # fallback final: se ainda None, usa ano atual (último recurso)
+        if season is None:
+            season = int(now_utc.year)
+
+        # ✅ report precisa existir ANTES do ingest()
+        report = {
+            "ok": True,
+            "plan": {
+                "league_id": int(league_id),
+                "season": int(season),
+                "days_ahead": int(days_ahead),
+                "max_calls": int(max_calls),
+            },
+            "raw": {"leagues": 0, "teams": 0, "fixtures": 0, "dedup": 0},
+            "core": {},
+            "calls": {"ok": 0, "fail": 0},
+        }
 
-    def ingest(endpoint: str, path: str, params: Dict[str, Any]) -> bool:
-        nonlocal calls_left
-        if calls_left <= 0:
-            return False
-
-        status, payload = client.get(path, params)
-        if not isinstance(payload, dict):
-            payload = {"errors": {"non_dict_payload": True}, "response": None}
-
-        ok = 200 <= int(status) < 300
-
-        inserted, _ = insert_raw_response(
-            provider="apifootball",
-            endpoint=endpoint,
-            request_params={"path": path, "params": params},
-            response_body=payload,
-            http_status=int(status),
-            ok=ok,
-            error_message=None if ok else str(payload.get("errors")),
-        )
+        def ingest(endpoint: str, path: str, params: Dict[str, Any]) -> bool:
+            nonlocal calls_left
+            if calls_left <= 0:
+                return False
+
+            status, payload = client.get(path, params)
+            if not isinstance(payload, dict):
+                payload = {"errors": {"non_dict_payload": True}, "response": None}
+
+            ok = 200 <= int(status) < 300
+
+            inserted, _ = insert_raw_response(
+                provider="apifootball",
+                endpoint=endpoint,
+                request_params={"path": path, "params": params},
+                response_body=payload,
+                http_status=int(status),
+                ok=ok,
+                error_message=None if ok else str(payload.get("errors")),
+            )
 
-        calls_left -= 1
-        if ok:
-            report["calls"]["ok"] += 1
-        else:
-            report["calls"]["fail"] += 1
+            calls_left -= 1
+            if ok:
+                report["calls"]["ok"] += 1
+            else:
+                report["calls"]["fail"] += 1
 
-        if inserted:
-            report["raw"][endpoint] += 1
-        else:
-            report["raw"]["dedup"] += 1
+            if inserted:
+                report["raw"][endpoint] += 1
+            else:
+                report["raw"]["dedup"] += 1
 
-        return ok
+            return ok
 
-    # 1) leagues (dimensão)
-    ingest("leagues", "/leagues", {"id": int(league_id)})
+        # 1) leagues (dimensão)
+        ingest("leagues", "/leagues", {"id": int(league_id)})
 
-    # 2) teams
-    ingest("teams", "/teams", {"league": int(league_id), "season": int(season)})
+        # 2) teams
+        ingest("teams", "/teams", {"league": int(league_id), "season": int(season)})
 
-    # 3) fixtures FUTUROS por janela
-    ingest(
-        "fixtures",
-        "/fixtures",
-        {
-            "league": int(league_id),
-            "season": int(season),
-            "from": from_ymd,
-            "to": to_ymd,
-        },
-    )
+        # 3) fixtures FUTUROS por janela
+        ingest(
+            "fixtures",
+            "/fixtures",
+            {
+                "league": int(league_id),
+                "season": int(season),
+                "from": from_ymd,
+                "to": to_ymd,
+            },
+        )
 
     # aplica CORE a partir do RAW recém inserido
     report["core"]["leagues"] = run_core_etl(provider="apifootball", endpoint="leagues", limit=5000, league_ids=[int(league_id)])
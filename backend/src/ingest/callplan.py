@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import json
+from itertools import islice
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
+from src.core.params_template import compile_params
 from src.core.settings import load_settings, CONFIG_DIR
 from src.db.engine import connect_sqlite
+from src.ingest.errors import IngestError
 from src.catalog.json_pick import pick, pick_season_year
 
 def _read_json(path: Path) -> Dict[str, Any]:
@@ -24,7 +27,7 @@ def load_latest_raw_payload(con, endpoint_key: str) -> Dict[str, Any]:
     )
     row = cur.fetchone()
     if not row:
-        raise ValueError(f"RAW não encontrado para endpoint: {endpoint_key}")
+        raise IngestError(f"RAW não encontrado para endpoint: {endpoint_key}", status_code=404)
     return json.loads(row[0])
 
 def build_calls_from_callplan(payload: Dict[str, Any], callplan: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -36,14 +39,17 @@ def build_calls_from_callplan(payload: Dict[str, Any], callplan: Dict[str, Any])
 
     items = pick(payload, items_path)
     if not isinstance(items, list):
-        raise ValueError("source.items_path não retornou lista")
+        raise IngestError("source.items_path não retornou lista")
 
     max_leagues = int(rules.get("max_leagues", 5))
     seasons_pick = str(rules.get("seasons_pick", "latest"))
 
+    # templates dos derived compilados 1x (não por liga)
+    compiled = [(d, compile_params(d.get("params", {}))) for d in derived]
+
     calls: List[Dict[str, Any]] = []
 
-    for item in items[:max_leagues]:
+    for item in islice(items, max(0, max_leagues)):
         league_id = pick(item, fields["league_id"])
         seasons_list = pick(item, fields["season_years"])
         season = pick_season_year(seasons_list, mode=seasons_pick)
@@ -51,18 +57,11 @@ def build_calls_from_callplan(payload: Dict[str, Any], callplan: Dict[str, Any])
         if league_id is None or season is None:
             continue
 
-        for d in derived:
-            params_template: Dict[str, Any] = d.get("params", {})
-            params: Dict[str, Any] = {}
-            for k, v in params_template.items():
-                if isinstance(v, str):
-                    v = v.replace("{league_id}", str(league_id)).replace("{season}", str(season))
-                params[k] = v
-
+        for d, fmt in compiled:
             calls.append({
                 "id": d["id"],
                 "path": d["path"],
-                "params": params,
+                "params": fmt(league_id, season),
                 "meta": {"league_id": league_id, "season": season}
             })
 
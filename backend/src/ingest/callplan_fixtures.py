@@ -6,6 +6,7 @@ from typing import Any, Dict, List
 
 from src.core.settings import load_settings, CONFIG_DIR
 from src.db.engine import connect_sqlite
+from src.ingest.errors import IngestError
 from src.catalog.json_pick import pick, pick_top_fixture_ids
 
 
@@ -26,7 +27,7 @@ def load_latest_raw_payload(con, endpoint_key: str) -> Dict[str, Any]:
     )
     row = cur.fetchone()
     if not row:
-        raise ValueError(f"RAW não encontrado para endpoint: {endpoint_key}")
+        raise IngestError(f"RAW não encontrado para endpoint: {endpoint_key}", status_code=404)
     return json.loads(row[0])
 
 
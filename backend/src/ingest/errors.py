@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+class IngestError(ValueError):
+    """
+    Falha esperada/classificada do ingest (ex: RAW ausente, callplan inválido).
+    As rotas admin devolvem direto status_code + detail, sem traceback.
+    """
+
+    def __init__(self, message: str, *, status_code: int = 422, detail: Any = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.detail = detail if detail is not None else {"error": message}
@@ -104,52 +104,51 @@ def run_apifootball_manifest() -> List[Dict[str, Any]]:
     provider = manifest.get("provider", "apifootball")
     endpoints = [e for e in manifest.get("endpoints", []) if e.get("enabled")]
 
-    client = ApiFootballClient(
+    with ApiFootballClient(
         base_url=settings.apifootball_base_url,
         api_key=settings.apifootball_key,
         timeout_s=int(settings.app_defaults.get("http_timeout_s", 30)),
-    )
-
-    results: List[Dict[str, Any]] = []
-
-    con = connect_sqlite(settings.db_path)
-    try:
-        con.execute("begin;")
-
-        for ep in endpoints:
-            ep_id = ep.get("id")
-            path = ep.get("path")
-            params = ep.get("sample_params", {}) or {}
-
-            try:
-                status, payload = client.get(path, params)
-            except Exception as ex:
-                status, payload = 599, {"errors": {"exception": str(ex)}, "response": None}
-
-            endpoint_key = f"{provider}:{ep_id}:{path}"
-
-            # IMPORTANT: agora passamos o path para gerar instance_key corretamente
-            save_raw(con, provider, endpoint_key, path, params, status, payload)
-
-            if isinstance(payload, dict):
-                catalog_payload(con, provider, endpoint_key, payload)
-
-            results.append(
-                {
-                    "provider": provider,
-                    "id": ep_id,
-                    "path": path,
-                    "status": status,
-                    "saved_as": endpoint_key,
-                }
-            )
-
-        con.execute("commit;")
-    except Exception:
-        con.execute("rollback;")
-        raise
-    finally:
-        con.close()
+    ) as client:
+        results: List[Dict[str, Any]] = []
+
+        con = connect_sqlite(settings.db_path)
+        try:
+            con.execute("begin;")
+
+            for ep in endpoints:
+                ep_id = ep.get("id")
+                path = ep.get("path")
+                params = ep.get("sample_params", {}) or {}
+
+                try:
+                    status, payload = client.get(path, params)
+                except Exception as ex:
+                    status, payload = 599, {"errors": {"exception": str(ex)}, "response": None}
+
+                endpoint_key = f"{provider}:{ep_id}:{path}"
+
+                # IMPORTANT: agora passamos o path para gerar instance_key corretamente
+                save_raw(con, provider, endpoint_key, path, params, status, payload)
+
+                if isinstance(payload, dict):
+                    catalog_payload(con, provider, endpoint_key, payload)
+
+                results.append(
+                    {
+                        "provider": provider,
+                        "id": ep_id,
+                        "path": path,
+                        "status": status,
+                        "saved_as": endpoint_key,
+                    }
+                )
+
+            con.execute("commit;")
+        except Exception:
+            con.execute("rollback;")
+            raise
+        finally:
+            con.close()
 
     return results
 
@@ -157,47 +156,46 @@ def run_apifootball_manifest() -> List[Dict[str, Any]]:
 def ingest_apifootball_calls(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     settings = load_settings()
 
-    client = ApiFootballClient(
+    with ApiFootballClient(
         base_url=settings.apifootball_base_url,
         api_key=settings.apifootball_key,
         timeout_s=int(settings.app_defaults.get("http_timeout_s", 30)),
-    )
-
-    provider = "apifootball"
-    results: List[Dict[str, Any]] = []
-
-    con = connect_sqlite(settings.db_path)
-    try:
-        for c in calls:
-            ep_id = c["id"]
-            path = c["path"]
-            params = c["params"]
-
-            try:
-                status, payload = client.get(path, params)
-            except Exception as ex:
-                status, payload = 599, {"errors": {"exception": str(ex)}, "response": None}
-
-            endpoint_key = f"{provider}:{ep_id}:{path}"
-
-            # commit por call = previsível (como você quer)
-            save_raw(con, provider, endpoint_key, path, params, status, payload)
-            if isinstance(payload, dict):
-                catalog_payload(con, provider, endpoint_key, payload)
-            con.commit()
-
-            results.append(
-                {
-                    "provider": provider,
-                    "id": ep_id,
-                    "path": path,
-                    "status": status,
-                    "saved_as": endpoint_key,
-                    "meta": c.get("meta", {}),
-                }
-            )
-    finally:
-        con.close()
+    ) as client:
+        provider = "apifootball"
+        results: List[Dict[str, Any]] = []
+
+        con = connect_sqlite(settings.db_path)
+        try:
+            for c in calls:
+                ep_id = c["id"]
+                path = c["path"]
+                params = c["params"]
+
+                try:
+                    status, payload = client.get(path, params)
+                except Exception as ex:
+                    status, payload = 599, {"errors": {"exception": str(ex)}, "response": None}
+
+                endpoint_key = f"{provider}:{ep_id}:{path}"
+
+                # commit por call = previsível (como você quer)
+                save_raw(con, provider, endpoint_key, path, params, status, payload)
+                if isinstance(payload, dict):
+                    catalog_payload(con, provider, endpoint_key, payload)
+                con.commit()
+
+                results.append(
+                    {
+                        "provider": provider,
+                        "id": ep_id,
+                        "path": path,
+                        "status": status,
+                        "saved_as": endpoint_key,
+                        "meta": c.get("meta", {}),
+                    }
+                )
+        finally:
+            con.close()
 
     return results
 
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Literal
 
 import numpy as np
@@ -9,7 +10,7 @@ from sklearn.linear_model import LogisticRegression
 
 from src.db.pg import pg_conn
 from src.metrics.features.match_features_v1 import build_match_features
-from src.models.artifact_store import load_json_artifact, save_json_artifact
+from src.models.artifact_store import ARTIFACTS_DIR, load_json_artifact, save_json_artifact
 
 
 LeagueId = int
@@ -133,6 +134,29 @@ def _softmax(logits: np.ndarray) -> np.ndarray:
     return e / np.sum(e)
 
 
+def _softmax_rows(logits: np.ndarray) -> np.ndarray:
+    z = logits - np.max(logits, axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / np.sum(e, axis=1, keepdims=True)
+
+
+@lru_cache(maxsize=16)
+def _load_artifact_cached(filename: str, mtime_ns: int, size: int) -> tuple[dict[str, Any], np.ndarray, np.ndarray]:
+    art = load_json_artifact(filename=filename)
+    return art, np.array(art["coef"], dtype=float), np.array(art["intercept"], dtype=float)
+
+
+def _load_artifact(filename: str) -> tuple[dict[str, Any], np.ndarray, np.ndarray]:
+    # Artifact (e coef/intercept já em ndarray) parseado 1x por versão do arquivo:
+    # a chave inclui mtime/tamanho, então re-treino/calibração regravando o arquivo invalida.
+    # Somente leitura para quem chama (o dict é compartilhado entre chamadas).
+    path = ARTIFACTS_DIR / filename
+    if not path.exists():
+        raise FileNotFoundError(f"artifact not found: {path}")
+    st = path.stat()
+    return _load_artifact_cached(filename, st.st_mtime_ns, st.st_size)
+
+
 def predict_1x2_from_artifact(
     *,
     artifact_filename: str,
@@ -141,7 +165,7 @@ def predict_1x2_from_artifact(
     home_team_id: int,
     away_team_id: int,
 ) -> dict[str, Any]:
-    art = load_json_artifact(filename=artifact_filename)
+    art, coef, intercept = _load_artifact(artifact_filename)
 
     if int(art["league_id"]) != int(league_id):
         raise ValueError("artifact league_id does not match request league_id")
@@ -155,8 +179,6 @@ def predict_1x2_from_artifact(
     )
 
     x = np.array([float(feats[k]) for k in art["feature_order"]], dtype=float)
-    coef = np.array(art["coef"], dtype=float)
-    intercept = np.array(art["intercept"], dtype=float)
 
     logits = intercept + coef @ x
 
@@ -203,3 +225,39 @@ def predict_1x2_from_artifact(
             "calibration": cal if cal else None,
         },
     }
+
+
+def predict_1x2_from_artifact_batch(
+    *,
+    artifact_filename: str,
+    rows: list[dict[str, Any]],
+) -> np.ndarray:
+    # Lote de predict_1x2_from_artifact: artifact lido 1x, logits numa matmul.
+    # Retorna float64[N, 3] na ordem H/D/A.
+    art, coef, intercept = _load_artifact(artifact_filename)
+    art_league_id = int(art["league_id"])
+    feature_order = art["feature_order"]
+
+    X = np.empty((len(rows), len(feature_order)), dtype=float)
+    for i, r in enumerate(rows):
+        league_id = int(r["league_id"])
+        if league_id != art_league_id:
+            raise ValueError("artifact league_id does not match request league_id")
+
+        feats = build_match_features(
+            home_team_id=int(r["home_team_id"]),
+            away_team_id=int(r["away_team_id"]),
+            league_id=league_id,
+            season=int(r["season"]),
+            allow_season_fallback=True,
+        )
+        X[i] = [float(feats[k]) for k in feature_order]
+
+    logits = X @ coef.T + intercept
+
+    T = 1.0
+    cal = art.get("calibration")
+    if cal and cal.get("type") == "temperature":
+        T = float(cal.get("T", 1.0))
+
+    return _softmax_rows(logits / T)
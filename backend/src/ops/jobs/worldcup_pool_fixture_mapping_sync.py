@@ -279,18 +279,18 @@ def _fetch_api_fixtures(
     season: int,
 ) -> Tuple[int, Dict[str, Any]]:
     settings = load_settings()
-    client = ApiFootballClient(
+    with ApiFootballClient(
         base_url=settings.apifootball_base_url,
         api_key=settings.apifootball_key,
         timeout_s=30,
-    )
-    return client.get(
-        "/fixtures",
-        {
-            "league": int(league_id),
-            "season": int(season),
-        },
-    )
+    ) as client:
+        return client.get(
+            "/fixtures",
+            {
+                "league": int(league_id),
+                "season": int(season),
+            },
+        )
 
 
 def _score_mapping_candidate(
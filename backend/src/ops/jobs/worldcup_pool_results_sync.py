@@ -633,11 +633,6 @@ def worldcup_pool_results_sync(
     retorna status final e o resultado passa pela confirmação curta.
     """
     settings = load_settings()
-    client = ApiFootballClient(
-        base_url=settings.apifootball_base_url,
-        api_key=settings.apifootball_key,
-        timeout_s=30,
-    )
 
     parsed_match_ids = _parse_int_list(match_ids)
     parsed_api_fixture_ids = _parse_int_list(api_fixture_ids)
@@ -678,149 +673,154 @@ def worldcup_pool_results_sync(
     by_fixture_id = {int(m["api_fixture_id"]): m for m in matches}
     now = _utc_now()
 
-    for chunk in _chunks(
-        list(by_fixture_id.keys()),
-        min(20, max(1, int(batch_size or 20))),
-    ):
-        status_code, payload = _fetch_fixtures_by_ids(client, chunk)
-        counters["api_batches"] += 1
-
-        if status_code >= 400:
-            return {
-                "ok": False,
-                "error": f"api_football_http_{status_code}",
-                "counters": counters,
-                "diagnostics": {
-                    "status_code": status_code,
-                    "payload_errors": (payload or {}).get("errors"),
-                },
-            }
-
-        api_errors = (payload or {}).get("errors")
-        if api_errors:
-            return {
-                "ok": False,
-                "error": "api_football_returned_errors",
-                "counters": counters,
-                "diagnostics": {
-                    "status_code": status_code,
-                    "payload_errors": api_errors,
-                },
-            }
-
-        response = (payload or {}).get("response") or []
-        if not isinstance(response, list):
-            response = []
-
-        for item in response:
-            if not isinstance(item, dict):
-                continue
-
-            api_fixture_id = _fixture_id(item)
-            if not api_fixture_id or api_fixture_id not in by_fixture_id:
-                counters["missing_api_fixture"] += 1
-                continue
-
-            counters["api_fixtures_seen"] += 1
-
-            match = by_fixture_id[api_fixture_id]
-            match_id = int(match["id"])
-            status_short = _status_short(item)
+    with ApiFootballClient(
+        base_url=settings.apifootball_base_url,
+        api_key=settings.apifootball_key,
+        timeout_s=30,
+    ) as client:
+        for chunk in _chunks(
+            list(by_fixture_id.keys()),
+            min(20, max(1, int(batch_size or 20))),
+        ):
+            status_code, payload = _fetch_fixtures_by_ids(client, chunk)
+            counters["api_batches"] += 1
+
+            if status_code >= 400:
+                return {
+                    "ok": False,
+                    "error": f"api_football_http_{status_code}",
+                    "counters": counters,
+                    "diagnostics": {
+                        "status_code": status_code,
+                        "payload_errors": (payload or {}).get("errors"),
+                    },
+                }
+
+            api_errors = (payload or {}).get("errors")
+            if api_errors:
+                return {
+                    "ok": False,
+                    "error": "api_football_returned_errors",
+                    "counters": counters,
+                    "diagnostics": {
+                        "status_code": status_code,
+                        "payload_errors": api_errors,
+                    },
+                }
 
-            _, mapping_status, mapping_note = _api_round_phase_diagnostic(
-                internal_phase=match.get("phase"),
-                item=item,
-            )
+            response = (payload or {}).get("response") or []
+            if not isinstance(response, list):
+                response = []
 
-            if mapping_status == "api_round_phase_mismatch":
-                counters["api_round_phase_mismatches"] += 1
+            for item in response:
+                if not isinstance(item, dict):
+                    continue
 
-            if dry_run:
-                if status_short in FINAL_STATUS_SHORTS:
-                    counters["final_seen_first_time"] += 1
-                else:
-                    counters["not_final"] += 1
-                continue
+                api_fixture_id = _fixture_id(item)
+                if not api_fixture_id or api_fixture_id not in by_fixture_id:
+                    counters["missing_api_fixture"] += 1
+                    continue
 
-            if status_short in CANCELLED_STATUS_SHORTS:
-                _mark_non_final_special_status(
-                    match_id=match_id,
-                    item=item,
-                    internal_status="cancelled",
-                    mapping_status=mapping_status,
-                    mapping_note=mapping_note,
-                )
-                counters["cancelled_or_abandoned"] += 1
-                continue
+                counters["api_fixtures_seen"] += 1
 
-            if status_short in POSTPONED_STATUS_SHORTS:
-                _mark_non_final_special_status(
-                    match_id=match_id,
-                    item=item,
-                    internal_status="postponed",
-                    mapping_status=mapping_status,
-                    mapping_note=mapping_note,
-                )
-                counters["postponed_or_suspended"] += 1
-                continue
+                match = by_fixture_id[api_fixture_id]
+                match_id = int(match["id"])
+                status_short = _status_short(item)
 
-            if status_short not in FINAL_STATUS_SHORTS:
-                _update_api_snapshot_only(
-                    match_id=match_id,
+                _, mapping_status, mapping_note = _api_round_phase_diagnostic(
+                    internal_phase=match.get("phase"),
                     item=item,
-                    mapping_status=mapping_status,
-                    mapping_note=mapping_note,
                 )
-                counters["not_final"] += 1
-                continue
 
-            home_score, away_score = _score_from_fixture(item)
-            if home_score is None or away_score is None:
-                _mark_final_seen(
-                    match_id=match_id,
-                    item=item,
-                    mapping_status=mapping_status,
-                    mapping_note=mapping_note,
-                )
-                counters["missing_score"] += 1
-                continue
+                if mapping_status == "api_round_phase_mismatch":
+                    counters["api_round_phase_mismatches"] += 1
+
+                if dry_run:
+                    if status_short in FINAL_STATUS_SHORTS:
+                        counters["final_seen_first_time"] += 1
+                    else:
+                        counters["not_final"] += 1
+                    continue
+
+                if status_short in CANCELLED_STATUS_SHORTS:
+                    _mark_non_final_special_status(
+                        match_id=match_id,
+                        item=item,
+                        internal_status="cancelled",
+                        mapping_status=mapping_status,
+                        mapping_note=mapping_note,
+                    )
+                    counters["cancelled_or_abandoned"] += 1
+                    continue
+
+                if status_short in POSTPONED_STATUS_SHORTS:
+                    _mark_non_final_special_status(
+                        match_id=match_id,
+                        item=item,
+                        internal_status="postponed",
+                        mapping_status=mapping_status,
+                        mapping_note=mapping_note,
+                    )
+                    counters["postponed_or_suspended"] += 1
+                    continue
+
+                if status_short not in FINAL_STATUS_SHORTS:
+                    _update_api_snapshot_only(
+                        match_id=match_id,
+                        item=item,
+                        mapping_status=mapping_status,
+                        mapping_note=mapping_note,
+                    )
+                    counters["not_final"] += 1
+                    continue
+
+                home_score, away_score = _score_from_fixture(item)
+                if home_score is None or away_score is None:
+                    _mark_final_seen(
+                        match_id=match_id,
+                        item=item,
+                        mapping_status=mapping_status,
+                        mapping_note=mapping_note,
+                    )
+                    counters["missing_score"] += 1
+                    continue
+
+                final_seen_at = match.get("api_final_seen_at_utc")
+                if not final_seen_at:
+                    _mark_final_seen(
+                        match_id=match_id,
+                        item=item,
+                        mapping_status=mapping_status,
+                        mapping_note=mapping_note,
+                    )
+                    counters["final_seen_first_time"] += 1
+                    continue
+
+                elapsed_after_seen = now - final_seen_at
+                delay_seconds = max(0, int(confirmation_delay_minutes or 0)) * 60
+                if elapsed_after_seen.total_seconds() < delay_seconds:
+                    _mark_final_seen(
+                        match_id=match_id,
+                        item=item,
+                        mapping_status=mapping_status,
+                        mapping_note=mapping_note,
+                    )
+                    counters["final_seen_first_time"] += 1
+                    continue
 
-            final_seen_at = match.get("api_final_seen_at_utc")
-            if not final_seen_at:
-                _mark_final_seen(
-                    match_id=match_id,
-                    item=item,
-                    mapping_status=mapping_status,
-                    mapping_note=mapping_note,
-                )
-                counters["final_seen_first_time"] += 1
-                continue
-
-            elapsed_after_seen = now - final_seen_at
-            delay_seconds = max(0, int(confirmation_delay_minutes or 0)) * 60
-            if elapsed_after_seen.total_seconds() < delay_seconds:
-                _mark_final_seen(
-                    match_id=match_id,
+                result = _finalize_match_from_api(
+                    match=match,
                     item=item,
-                    mapping_status=mapping_status,
-                    mapping_note=mapping_note,
+                    home_score=home_score,
+                    away_score=away_score,
                 )
-                counters["final_seen_first_time"] += 1
-                continue
-
-            result = _finalize_match_from_api(
-                match=match,
-                item=item,
-                home_score=home_score,
-                away_score=away_score,
-            )
 
-            if result.get("conflict"):
-                counters["conflicts"] += 1
+                if result.get("conflict"):
+                    counters["conflicts"] += 1
 
-            if result.get("finalized"):
-                counters["final_confirmed"] += 1
-                counters["predictions_locked"] += int(result.get("predictions_locked") or 0)
-                counters["events_inserted"] += int(result.get("events_inserted") or 0)
+                if result.get("finalized"):
+                    counters["final_confirmed"] += 1
+                    counters["predictions_locked"] += int(result.get("predictions_locked") or 0)
+                    counters["events_inserted"] += int(result.get("events_inserted") or 0)
 
     return {"ok": True, "counters": counters}
\ No newline at end of file
@@ -1,15 +1,69 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Tuple
+import threading
+from typing import Any, Dict, Optional, Tuple
 import httpx
 
+try:
+    import h2  # noqa: F401  opcional: habilita HTTP/2 no httpx (várias requests numa conexão TLS)
+except ImportError:  # pragma: no cover
+    h2 = None
+
+try:
+    import orjson  # opcional: parse dos payloads (dezenas de KB por página) bem mais rápido
+except ImportError:  # pragma: no cover
+    orjson = None
+
 class ApiFootballClient:
-    def __init__(self, base_url: str, api_key: str, timeout_s: int = 30):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout_s: int = 30,
+        *,
+        connect_timeout_s: Optional[float] = None,
+        connect_retries: int = 2,
+    ):
         if not base_url:
             raise ValueError("APIFOOTBALL_BASE_URL vazio")
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key.strip()
         self.timeout_s = timeout_s
+        # timeout_s vale para read/write/pool; o connect tem orçamento próprio (curto),
+        # para um handshake lento não consumir o tempo da leitura.
+        self.connect_timeout_s = min(5.0, float(timeout_s)) if connect_timeout_s is None else float(connect_timeout_s)
+        # retries só de conexão (nada foi enviado, não gasta quota da API)
+        self.connect_retries = max(0, int(connect_retries))
+        # 1 httpx.Client por instância (keep-alive + pool de conexões), criado sob demanda.
+        # httpx.Client é thread-safe, então a mesma instância pode ser usada em paralelo.
+        self._http: Optional[httpx.Client] = None
+        self._http_lock = threading.Lock()
+
+    def _client(self) -> httpx.Client:
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    limits = httpx.Limits(max_connections=20, max_keepalive_connections=20)
+                    self._http = httpx.Client(
+                        timeout=httpx.Timeout(self.timeout_s, connect=self.connect_timeout_s),
+                        transport=httpx.HTTPTransport(
+                            retries=self.connect_retries,
+                            limits=limits,
+                            http2=h2 is not None,
+                        ),
+                    )
+        return self._http
+
+    def close(self) -> None:
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    def __enter__(self) -> "ApiFootballClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
 
     def get(self, path: str, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
         if not self.api_key:
@@ -18,7 +72,8 @@ class ApiFootballClient:
 
         headers = {"x-apisports-key": self.api_key}
 
-        with httpx.Client(timeout=self.timeout_s) as client:
-            r = client.get(f"{self.base_url}{path}", params=params, headers=headers)
-            # se não for JSON válido, isso vai levantar exceção -> tratamos no runner
-            return r.status_code, r.json()
+        r = self._client().get(f"{self.base_url}{path}", params=params, headers=headers)
+        # se não for JSON válido, isso vai levantar exceção -> tratamos no runner
+        if orjson is not None:
+            return r.status_code, orjson.loads(r.content)
+        return r.status_code, r.json()